@@ -0,0 +1,268 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Tuple
+
+from preprocess.sentence import Sentence, Word
+from preprocess.tokenizer.part_of_speech import (
+    get_part_of_speech_code,
+    get_part_of_speech_from_code
+)
+
+# Sentence stored as columns rather than as a tuple of Words: the text of
+# the whole sentence, the index each word ends at, and an integer code
+# for each word's part of speech. Words are only created when accessed,
+# which avoids keeping millions of small objects alive for long texts.
+#
+# Has the same API and behaviour as Sentence, and can be compared with
+# Sentences that contain the same words.
+class ColumnarSentence(Sentence):
+    def __init__(
+        self,
+        text:str,
+        # Index after the last character of each word
+        word_ending_indexes:array,
+        part_of_speech_codes:array
+    ):
+        self._str = text
+        self._word_ending_indexes = word_ending_indexes
+        self._part_of_speech_codes = part_of_speech_codes
+
+    @classmethod
+    def from_words(cls, words:Iterable[Word]) -> "ColumnarSentence":
+        sentence_writer = ColumnarSentenceWriter()
+        sentence_writer.extend(words)
+        return sentence_writer.build()
+
+    # A new tuple of Words is created on every access, so prefer
+    # get_word or iterating over iter_words where possible
+    @property
+    def words(self) -> Tuple[Word, ...]:
+        return tuple(self.iter_words())
+
+    @property
+    def _word_starting_indexes(self) -> Tuple[int, ...]:
+        return tuple(
+            self._get_word_starting_index(word_index) 
+            for word_index in range(len(self._word_ending_indexes))
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ColumnarSentence):
+            return self._str == other._str and \
+                self._word_ending_indexes == other._word_ending_indexes and \
+                self._part_of_speech_codes == other._part_of_speech_codes
+        return super().__eq__(other)
+
+    def _new_sentence(self, words:Iterable[Word]) -> "ColumnarSentence":
+        return ColumnarSentence.from_words(words)
+
+    def iter_words(self) -> Iterator[Word]:
+        text = self._str
+        word_starting_index = 0
+        for word_ending_index, part_of_speech_code in \
+                zip(self._word_ending_indexes, self._part_of_speech_codes):
+            yield Word(
+                text[word_starting_index:word_ending_index],
+                get_part_of_speech_from_code(part_of_speech_code)
+            )
+            word_starting_index = word_ending_index
+
+    def get_word(self, word_index:int) -> Word:
+        return Word(
+            self._get_word_text(word_index),
+            get_part_of_speech_from_code(self._part_of_speech_codes[word_index])
+        )
+
+    def replace_word_and_count(self, old_word:Word, new_text:str) -> Tuple["ColumnarSentence", int]:
+        matching_word_indexes = self._find_word(old_word)
+        if len(matching_word_indexes) == 0:
+            return self, 0
+        new_sentence = self._replace_word_ranges(
+            [(word_index, word_index + 1) for word_index in matching_word_indexes],
+            new_text,
+            self._part_of_speech_codes[matching_word_indexes[0]]
+        )
+        return new_sentence, len(matching_word_indexes)
+
+    def replace_and_count(self, old_text:str, new_word:Word) -> Tuple["ColumnarSentence", int]:
+        matching_word_ranges = self._find_word_sequences(old_text)
+        if len(matching_word_ranges) == 0:
+            return self, 0
+        new_sentence = self._replace_word_ranges(
+            matching_word_ranges,
+            new_word.text,
+            get_part_of_speech_code(new_word.part_of_speech)
+        )
+        return new_sentence, len(matching_word_ranges)
+
+    def count(self, query:str) -> int:
+        return len(self._find_word_sequences(query))
+
+    def count_word(self, query_word:Word) -> int:
+        return len(self._find_word(query_word))
+
+    def get_word_index_from_char_index(self, char_index:int) -> int:
+        if char_index < 0:
+            raise IndexError(
+                f"Index must be greater than or equal to 0. Received negative index: {char_index}"
+            )
+        elif char_index >= len(self._str):
+            raise IndexError(f"Index out of bounds: {char_index}")
+        # Words ending at char_index are empty or end before it
+        return bisect_right(self._word_ending_indexes, char_index)
+
+    def _get_word_starting_index(self, word_index:int) -> int:
+        if word_index == 0:
+            return 0
+        return self._word_ending_indexes[word_index - 1]
+
+    def _get_word_text(self, word_index:int) -> str:
+        return self._str[
+            self._get_word_starting_index(word_index):self._word_ending_indexes[word_index]
+        ]
+
+    def _find_word(self, query_word:Word) -> List[int]:
+        query_part_of_speech_code = get_part_of_speech_code(query_word.part_of_speech)
+        return [
+            word_index for word_index, part_of_speech_code in enumerate(self._part_of_speech_codes)
+            if part_of_speech_code == query_part_of_speech_code and \
+               self._get_word_text(word_index) == query_word.text
+        ]
+
+    # Returns the (starting word index, ending word index) of each
+    # sequence of whole words matching the query, with the same matching
+    # rules as Sentence.count. A match must start at the start of a word
+    # and end at the end of a word, as searching resumes either after a
+    # match or at the start of the next word.
+    def _find_word_sequences(self, query:str) -> List[Tuple[int, int]]:
+        matching_word_ranges = []
+        if len(query) == 0:
+            return matching_word_ranges
+        text = self._str
+        word_ending_indexes = self._word_ending_indexes
+        search_starting_index = 0
+        while True:
+            current_match_index = text.find(query, search_starting_index)
+            if current_match_index == -1:
+                break
+            matching_word_index = bisect_right(word_ending_indexes, current_match_index)
+            if self._get_word_starting_index(matching_word_index) == current_match_index:
+                current_match_ending_index = current_match_index + len(query)
+                last_word_index = bisect_left(word_ending_indexes, current_match_ending_index)
+                if last_word_index < len(word_ending_indexes) and \
+                   word_ending_indexes[last_word_index] == current_match_ending_index:
+                    matching_word_ranges.append((matching_word_index, last_word_index + 1))
+                    search_starting_index = current_match_ending_index
+                    continue
+            search_starting_index = word_ending_indexes[matching_word_index]
+        return matching_word_ranges
+
+    # Replaces each non-overlapping range of words, in order, with a
+    # single word
+    def _replace_word_ranges(
+        self,
+        word_ranges:List[Tuple[int, int]],
+        new_text:str,
+        new_part_of_speech_code:int
+    ) -> "ColumnarSentence":
+        text = self._str
+        word_ending_indexes = self._word_ending_indexes
+        part_of_speech_codes = self._part_of_speech_codes
+        new_text_parts = []
+        new_word_ending_indexes = array("I")
+        new_part_of_speech_codes = array("H")
+        # Difference between the new and old indexes of the words
+        # following the last replacement
+        index_offset = 0
+        previous_ending_word_index = 0
+        for starting_word_index, ending_word_index in word_ranges:
+            new_text_parts.append(text[
+                self._get_word_starting_index(previous_ending_word_index):
+                self._get_word_starting_index(starting_word_index)
+            ])
+            new_word_ending_indexes.extend(
+                word_ending_index + index_offset for word_ending_index
+                in word_ending_indexes[previous_ending_word_index:starting_word_index]
+            )
+            new_part_of_speech_codes.extend(
+                part_of_speech_codes[previous_ending_word_index:starting_word_index]
+            )
+            replaced_text_length = word_ending_indexes[ending_word_index - 1] - \
+                self._get_word_starting_index(starting_word_index)
+            index_offset += len(new_text) - replaced_text_length
+            new_text_parts.append(new_text)
+            new_word_ending_indexes.append(word_ending_indexes[ending_word_index - 1] + index_offset)
+            new_part_of_speech_codes.append(new_part_of_speech_code)
+            previous_ending_word_index = ending_word_index
+        new_text_parts.append(text[self._get_word_starting_index(previous_ending_word_index):])
+        new_word_ending_indexes.extend(
+            word_ending_index + index_offset for word_ending_index
+            in word_ending_indexes[previous_ending_word_index:]
+        )
+        new_part_of_speech_codes.extend(part_of_speech_codes[previous_ending_word_index:])
+        return ColumnarSentence(
+            "".join(new_text_parts),
+            new_word_ending_indexes,
+            new_part_of_speech_codes
+        )
+
+# Builds a ColumnarSentence from words added in order. Only the columns
+# are kept, so the words can be discarded as soon as they are added.
+class ColumnarSentenceWriter:
+    def __init__(self):
+        self._text_parts:List[str] = []
+        self._text_length = 0
+        self._word_ending_indexes = array("I")
+        self._part_of_speech_codes = array("H")
+
+    def append(self, word:Word):
+        self.append_text(word.text, get_part_of_speech_code(word.part_of_speech))
+
+    def append_text(self, text:str, part_of_speech_code:int):
+        self._text_parts.append(text)
+        self._text_length += len(text)
+        self._word_ending_indexes.append(self._text_length)
+        self._part_of_speech_codes.append(part_of_speech_code)
+
+    # Joins the text of the words into a single part, so that one string
+    # is kept for all of them rather than one for each word
+    def extend(self, words:Iterable[Word]):
+        word_texts = []
+        for word in words:
+            word_texts.append(word.text)
+            self._text_length += len(word.text)
+            self._word_ending_indexes.append(self._text_length)
+            self._part_of_speech_codes.append(get_part_of_speech_code(word.part_of_speech))
+        self._text_parts.append("".join(word_texts))
+
+    # Adds the words of the sentence from starting_word_index up to, but
+    # not including, ending_word_index, copying their columns as they are
+    def extend_from_sentence(
+        self, 
+        sentence:ColumnarSentence, 
+        starting_word_index:int, 
+        ending_word_index:int
+    ):
+        if starting_word_index >= ending_word_index:
+            return
+        text_starting_index = sentence._get_word_starting_index(starting_word_index)
+        text_ending_index = sentence._word_ending_indexes[ending_word_index - 1]
+        self._text_parts.append(sentence._str[text_starting_index:text_ending_index])
+        index_offset = self._text_length - text_starting_index
+        self._word_ending_indexes.extend(
+            word_ending_index + index_offset for word_ending_index
+            in sentence._word_ending_indexes[starting_word_index:ending_word_index]
+        )
+        self._part_of_speech_codes.extend(
+            sentence._part_of_speech_codes[starting_word_index:ending_word_index]
+        )
+        self._text_length += text_ending_index - text_starting_index
+
+    # The columns are handed over to the sentence rather than copied, so
+    # nothing should be added after building
+    def build(self) -> ColumnarSentence:
+        return ColumnarSentence(
+            "".join(self._text_parts),
+            self._word_ending_indexes,
+            self._part_of_speech_codes
+        )
@@ -29,6 +29,7 @@ from enum import Flag
 from collections import namedtuple
 import itertools
 
+from preprocess.multi_pattern_replacer import compile_replacements
 
 
 class Names(Flag):
@@ -74,6 +75,13 @@ class MTL_Preprocess:
         return n
 
 
+    def replace_words(self, replacements):
+        replacer = compile_replacements(tuple(replacements.items()))
+        self.text, counts = replacer.replace(self.text)
+        self.total_replacements += sum(counts)
+        return counts
+
+
     def loop_names(self, character,
                    replace=Names.FULL_NAME,
                    honorific=Names.ALL_NAMES):
@@ -140,6 +148,76 @@ class MTL_Preprocess:
             print(", ".join(map(lambda x: f'{x}-{data[x]}',
                                 filter(lambda x: data[x]>0, data))), end=')\n')
 
+    # Same as calling replace_name for every name of each of the rules in
+    # order, but with all of their replacements applied as one ordered
+    # group, in as few passes over the text as possible. Rules that
+    # replace_name would have stopped with a KeyError (a missing table, or
+    # names without any honorifics table) are skipped.
+    #
+    # Returns, for each rule, the number of replacements it made along
+    # with the (en name, replacement counts) of each of its names, or None
+    # if the rule was skipped.
+    def replace_names(self, rules, replaced_names):
+        replacements = []
+        # (rule results, en name, data key) for each replacement
+        replacement_sources = []
+        rule_results = []
+        honorifics = self.rep.get('honorifics')
+        for rule in rules:
+            if rule[1] not in self.rep:
+                rule_results.append(None)
+                continue
+            name_results = []
+            rule_result = [0, name_results]
+            rule_replacements = []
+            rule_replacement_sources = []
+            rule_replaced_names = set()
+            try:
+                for k, v in self.rep[rule[1]].items():
+                    if not isinstance(v, list):
+                        v = [v]
+                    char = Character(" ".join(v), k)
+                    for nen, njp, no_honor in self.loop_names(char, rule[3], rule[4]):
+                        if njp in replaced_names or njp in rule_replaced_names:
+                            continue
+                        if honorifics is None:
+                            raise KeyError('honorifics')
+                        rule_replaced_names.add(njp)
+                        data = dict()
+                        name_results.append((nen, njp, data))
+                        for hon, hon_en in honorifics.items():
+                            rule_replacements.append((f'{njp}{hon}', f'{nen}-{hon_en}'))
+                            rule_replacement_sources.append((rule_result, data, hon_en))
+                        if no_honor:
+                            if len(njp) > 1 or not self.single_kanji_filter:
+                                rule_replacements.append((njp, nen))
+                                rule_replacement_sources.append((rule_result, data, 'NA'))
+            except KeyError:
+                rule_results.append(None)
+                continue
+            for njp in rule_replaced_names:
+                replaced_names[njp] = 0
+            replacements += rule_replacements
+            replacement_sources += rule_replacement_sources
+            rule_results.append(rule_result)
+        replacer = compile_replacements(tuple(replacements))
+        self.text, counts = replacer.replace(self.text)
+        for (rule_result, data, data_key), n in zip(replacement_sources, counts):
+            rule_result[0] += n
+            data[data_key] = n
+        for rule_result in rule_results:
+            if rule_result is None:
+                continue
+            for nen, njp, data in rule_result[1]:
+                replaced_names[njp] = sum(data.values())
+        return [
+            None if rule_result is None else (
+                rule_result[0], 
+                [(nen, data) for nen, njp, data in rule_result[1]]
+            )
+            for rule_result in rule_results
+        ]
+
     def replace(self):
         rules = [
             # title, json_key, is_name, replace_name, no_honorifics
@@ -156,28 +234,46 @@ class MTL_Preprocess:
         ]
 
         replaced_names = dict()
+        # Results of each name rule, which are replaced together along
+        # with any name rules that directly follow them
+        name_rule_results = dict()
         time_start = time.time()
-        for rule in rules:
+        for rule_index, rule in enumerate(rules):
             prev_count = self.total_replacements
             if self.verbose:
                 print(f'* {rule[0]} Replacements:')
             if rule[2]:             # if it is a name
-                try:
-                    for k, v in self.rep[rule[1]].items():
-                        if not isinstance(v, list):
-                            v = [v]
-                        char = Character(" ".join(v), k)
-                        self.replace_name(char, rule[3], rule[4], replaced_names)
-                except KeyError:
+                if rule_index not in name_rule_results:
+                    name_rule_count = 0
+                    while rule_index + name_rule_count < len(rules) and \
+                          rules[rule_index + name_rule_count][2]:
+                        name_rule_count += 1
+                    name_rules = rules[rule_index:rule_index + name_rule_count]
+                    for i, name_rule_result in enumerate(
+                            self.replace_names(name_rules, replaced_names)
+                        ):
+                        name_rule_results[rule_index + i] = name_rule_result
+                name_rule_result = name_rule_results[rule_index]
+                if name_rule_result is None:
                     continue
+                rule_replacement_count, name_results = name_rule_result
+                self.total_replacements += rule_replacement_count
+                for nen, data in name_results:
+                    total = sum(data.values())
+                    if not self.verbose or total == 0:
+                        continue
+                    print(f'    {nen} :{total} (', end='')
+                    print(", ".join(map(lambda x: f'{x}-{data[x]}',
+                                        filter(lambda x: data[x]>0, data))), end=')\n')
             else:
                 try:
-                    for k, v in self.rep[rule[1]].items():
-                        n = self.replace_single_word(k, v)
-                        if n > 0:
-                            print(f'    {k} → {v}:{n}')
+                    replacements = self.rep[rule[1]]
                 except KeyError:
                     continue
+                counts = self.replace_words(replacements)
+                for (k, v), n in zip(replacements.items(), counts):
+                    if n > 0:
+                        print(f'    {k} → {v}:{n}')
             print(f'  SubTotal: {self.total_replacements-prev_count}')
 
         time_end = time.time()
@@ -0,0 +1,131 @@
+from functools import lru_cache
+import re
+from typing import Iterable, List, Tuple
+
+# Applies an ordered group of literal replacements in as few passes over
+# the text as possible, while producing exactly the same output as
+# running str.replace once per replacement, in order.
+#
+# Sequential replacement gives earlier entries priority over later ones:
+# once an earlier key has been replaced, any later key that overlapped it
+# can no longer match. A single left-to-right regex pass, where the
+# alternatives are listed in table order, only reproduces this when a
+# later key can never start before an overlapping occurrence of an
+# earlier key, and when a later key can never match text introduced by
+# an earlier replacement. The replacements are therefore split into
+# consecutive batches in which both conditions hold, and each batch is
+# applied in a single pass.
+class MultiPatternReplacer:
+    def __init__(self, replacements:Iterable[Tuple[str, str]]):
+        self._replacements = list(replacements)
+        # Each batch is a list of indexes into self._replacements
+        self._batches = self._build_batches()
+        self._batch_patterns = []
+        # Keys are unique within a batch, so the matched text identifies
+        # which replacement was made
+        self._batch_lookups = []
+        for batch in self._batches:
+            if len(batch) == 1:
+                # Single replacements are faster with str.replace, and
+                # it also handles the empty-string key the same way as
+                # the original sequential replacement.
+                self._batch_patterns.append(None)
+            else:
+                self._batch_patterns.append(re.compile("|".join([
+                    re.escape(self._replacements[i][0]) for i in batch
+                ])))
+            self._batch_lookups.append({
+                self._replacements[i][0]: i for i in batch
+            })
+
+    def __len__(self) -> int:
+        return len(self._replacements)
+
+    @property
+    def batch_count(self) -> int:
+        return len(self._batches)
+
+    # Returns the replaced text along with the number of replacements
+    # made for each (old, new) pair, in the order they were provided
+    def replace(self, text:str) -> Tuple[str, List[int]]:
+        counts = [0] * len(self._replacements)
+        for batch, pattern, batch_lookup in zip(
+                self._batches, self._batch_patterns, self._batch_lookups
+            ):
+            if pattern is None:
+                replacement_index = batch[0]
+                old, new = self._replacements[replacement_index]
+                n = text.count(old)
+                if n > 0:
+                    text = text.replace(old, new)
+                    counts[replacement_index] = n
+                continue
+            def substitute(match, batch_lookup=batch_lookup):
+                replacement_index = batch_lookup[match.group()]
+                counts[replacement_index] += 1
+                return self._replacements[replacement_index][1]
+            text = pattern.sub(substitute, text)
+        return text, counts
+
+    def _build_batches(self) -> List[List[int]]:
+        batches = []
+        current_batch = []
+        # Characters introduced by the replacements in the current batch
+        current_batch_new_chars = set()
+        # Keys in the current batch, and every prefix of those keys
+        current_batch_olds = set()
+        current_batch_old_prefixes = set()
+        for i, (old, new) in enumerate(self._replacements):
+            # Only the first of any duplicate keys in a batch could match,
+            # so a duplicate key starts a new batch, where it matches any
+            # occurrences that the earlier replacements reintroduced.
+            # Empty keys are never batched with other keys.
+            can_extend_batch = len(old) > 0 and \
+                len(current_batch) > 0 and \
+                "" not in current_batch_olds and \
+                old not in current_batch_olds and \
+                not (current_batch_new_chars & set(old)) and \
+                not _can_start_before_overlap(old, current_batch_olds, current_batch_old_prefixes)
+            if not can_extend_batch and len(current_batch) > 0:
+                batches.append(current_batch)
+                current_batch = []
+                current_batch_new_chars = set()
+                current_batch_olds = set()
+                current_batch_old_prefixes = set()
+            current_batch.append(i)
+            current_batch_new_chars |= set(new)
+            current_batch_olds.add(old)
+            for j in range(1, len(old) + 1):
+                current_batch_old_prefixes.add(old[:j])
+            # Removing text joins the surrounding text together, which
+            # can create new matches for any of the following keys
+            if len(new) == 0:
+                batches.append(current_batch)
+                current_batch = []
+                current_batch_new_chars = set()
+                current_batch_olds = set()
+                current_batch_old_prefixes = set()
+        if len(current_batch) > 0:
+            batches.append(current_batch)
+        return batches
+
+# Replacement tables are the same for every chapter in a run, so the
+# compiled replacers are reused rather than rebuilt per chapter
+@lru_cache(maxsize=32)
+def compile_replacements(replacements:Tuple[Tuple[str, str], ...]) -> MultiPatternReplacer:
+    return MultiPatternReplacer(replacements)
+
+# Returns True if an occurrence of later_key could start before, and
+# overlap with, an occurrence of any of the (non-empty) earlier keys. This
+# is the case if an earlier key occurs inside later_key after its first
+# character, or if one of later_key's proper suffixes is a prefix of an
+# earlier key. Checks every earlier key at once, given the set of all of
+# their prefixes.
+def _can_start_before_overlap(later_key:str, earlier_keys:set, earlier_key_prefixes:set) -> bool:
+    for offset in range(1, len(later_key)):
+        if later_key[offset:] in earlier_key_prefixes:
+            return True
+        for ending_index in range(offset + 1, len(later_key) + 1):
+            if later_key[offset:ending_index] in earlier_keys:
+                return True
+    return False
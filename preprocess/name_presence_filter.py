@@ -0,0 +1,55 @@
+from typing import Dict, List, Sequence
+
+from preprocess.replacement_plan import ReplacementOperation
+
+# Finds the name operations that could make a replacement in a tagged
+# text, so that operations for names that never appear in a chapter can
+# be skipped, as can tagging the chapter if none of them appear.
+#
+# Tokenized replacements only match sequences of whole words, and the
+# only words that were not in the text when it was tagged are the words
+# introduced by earlier replacements. An operation can therefore only
+# make a replacement if its pattern occurs in the tagged text, or if it
+# contains the entire replacement text of an earlier operation that
+# could have made a replacement.
+class NamePresenceFilter:
+    def __init__(self, text:str):
+        # Text at the time it was (or will be) tagged
+        self._text = text
+        # Whether each name variant that has been checked occurs in the
+        # text. Every pattern of a name operation starts with its name
+        # variant, so most patterns can be ruled out by a single check
+        # for the variant.
+        self._jp_name_presence:Dict[str, bool] = {}
+        self._kept_replacement_texts = set()
+        self._kept_replacement_chars = set()
+
+    # Returns the indexes of the operations that could make a replacement,
+    # given that every operation kept by earlier calls has been applied
+    def filter(self, operations:Sequence[ReplacementOperation]) -> List[int]:
+        kept_operation_indexes = []
+        for i, operation in enumerate(operations):
+            if self._could_match(operation):
+                kept_operation_indexes.append(i)
+                self._kept_replacement_texts.add(operation.replacement)
+                self._kept_replacement_chars |= set(operation.replacement)
+        return kept_operation_indexes
+
+    def _could_match(self, operation:ReplacementOperation) -> bool:
+        pattern = operation.pattern
+        # Patterns can only contain a replacement text if they share all
+        # of its characters, which replacement texts in another script
+        # never do
+        if not self._kept_replacement_chars.isdisjoint(pattern) or \
+           "" in self._kept_replacement_texts:
+            if any(text in pattern for text in self._kept_replacement_texts):
+                return True
+        jp_name = operation.jp_name
+        if jp_name is not None and pattern.startswith(jp_name):
+            jp_name_is_present = self._jp_name_presence.get(jp_name)
+            if jp_name_is_present is None:
+                jp_name_is_present = jp_name in self._text
+                self._jp_name_presence[jp_name] = jp_name_is_present
+            if not jp_name_is_present:
+                return False
+        return pattern in self._text
@@ -2,20 +2,36 @@
 # character checking to identify likely words. Might be replaced
 # with a dedicated NER library in the future.
 
+import os.path
+from typing import Dict, FrozenSet, Optional
+
 from preprocess.ner.named_entity_recognizer import NamedEntityRecognizer
-from preprocess.utils import is_katakana
+from preprocess.utils import classify_katakana, is_katakana
 
 KATAKANA_WORDS_FILE = "data/katakana_words.txt"
 
+# Katakana word lists that have already been loaded, by absolute path.
+# Each list is only read and validated once per process and is shared
+# by every recognizer. Worker processes forked after a list is loaded
+# inherit it rather than reading the file again.
+_KATAKANA_WORD_SETS:Dict[str, FrozenSet[str]] = {}
+
+def load_katakana_words(filename:Optional[str] = KATAKANA_WORDS_FILE) -> FrozenSet[str]:
+    path = os.path.abspath(filename)
+    katakana_words = _KATAKANA_WORD_SETS.get(path)
+    if katakana_words is None:
+        with open(path) as infile:
+            words = [row.strip() for row in infile]
+        for word, word_is_katakana in zip(words, classify_katakana(words)):
+            if not word_is_katakana:
+                raise ValueError(f"Received unexpected non-katakana word: {word}")
+        katakana_words = frozenset(words)
+        _KATAKANA_WORD_SETS[path] = katakana_words
+    return katakana_words
+
 class BasicNamedEntityRecognizer(NamedEntityRecognizer):
-    def __init__(self):
-        self._katakana_words = set()
-        with open(KATAKANA_WORDS_FILE) as infile:
-            for row in infile:
-                word = row.strip()
-                if not is_katakana(word):
-                    raise ValueError(f"Received unexpected non-katakana word: {word}")
-                self._katakana_words.add(row.strip())
+    def __init__(self, katakana_words_file:Optional[str] = KATAKANA_WORDS_FILE):
+        self._katakana_words = load_katakana_words(katakana_words_file)
 
     def is_name(self, value:str) -> bool:
         # For the time being treat all kanji names as being not being
@@ -25,4 +41,4 @@ class BasicNamedEntityRecognizer(NamedEntityRecognizer):
         return not self.is_known_katakana_word(value)
 
     def is_known_katakana_word(self, value:str) -> bool:
-        return value in self._katakana_words
\ No newline at end of file
+        return value in self._katakana_words
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+from bisect import bisect_right
 import re
 import sys
 import json
@@ -7,12 +8,19 @@ import os
 import time
 
 from enum import Flag
-from typing import NamedTuple, Optional, List
+from typing import Dict, NamedTuple, Optional, List, Set, Tuple
 import itertools
 
+from preprocess.multi_pattern_replacer import compile_replacements
+from preprocess.name_presence_filter import NamePresenceFilter
+from preprocess.ner.basic_named_entity_recognizer import BasicNamedEntityRecognizer
+from preprocess.phrase_matcher import compile_phrases
+from preprocess.replacement_plan import ReplacementOperation, ReplacementPlan
 from preprocess.tagger import Tagger
 from preprocess.tokenizer.part_of_speech import PartOfSpeech
-from preprocess.sentence import Word
+from preprocess.sentence import Sentence, Word, intern_word
+from preprocess.sentence_builder import SentenceBuilder
+from preprocess.utils import is_katakana
 
 # Bitwise flags for parts of names. The __contains__ operation for 
 # members is defined such that A.__contains__(B) is True if A has
@@ -53,6 +61,10 @@ class Rule(NamedTuple):
 
 JP_NAME_SEPS = ["・", ""]
 
+# Katakana names shorter than this are too likely to be part of another
+# word to be replaced as plain strings in hybrid mode
+HYBRID_MIN_NAME_LENGTH = 3
+
 class NLP_MTL_Preprocess:
     rules = [
         # title, json_key, is_name, is_tokenized_replacement, replace_name, no_honorifics
@@ -80,23 +92,95 @@ class NLP_MTL_Preprocess:
             replacement_table=None, 
             verbose=False,
             single_kanji_filter=True,
+            replacement_plan:Optional[ReplacementPlan]=None,
+            windowed_tagging=False,
+            hybrid=False,
+            columnar_sentences=None,
         ):
         self.text = text
         # Initialized prior to a rule where is_tokenized_replacement
-        # is True
-        self.tagged_text = None 
+        # is True, and kept across consecutive tokenized rules
+        self.sentence_builder:Optional[SentenceBuilder] = None
+        # Indexes of the operations of each name rule that could make a
+        # replacement, found at the start of each run of consecutive 
+        # tokenized rules. The text is only tagged once one of these
+        # operations needs to be applied.
+        self.present_name_operation_indexes:Optional[Dict[int, List[int]]] = None
         self.tagger = tagger
         if not replacement_table:
             replacement_table = {}
         self.replacement_table = replacement_table
+        # The plan can be compiled once and shared between preprocessors
+        # that use the same replacement table
+        if replacement_plan is None:
+            replacement_plan = self.compile_replacement_plan(replacement_table)
+        self.replacement_plan = replacement_plan
         self.total_replacements = 0
+        # Name operations skipped because their names are not in the text
+        self.total_skipped_operations = 0
         self.verbose = verbose
         # When single_kanji_filter is True, script will not make replacements 
         # for single-kanji names if the kanji is not followed by an honorific,
         # presumably because completely arbitrary single-kanji replacements can 
         # result in unintenionally replacing parts of random words.
         self.single_kanji_filter = single_kanji_filter
+        # When windowed_tagging is True, only the lines containing a name
+        # that could be replaced are tagged, and every other line is left 
+        # as a single untagged word. Tokenized replacements never match
+        # across lines, so the output is the same as tagging every line.
+        self.windowed_tagging = windowed_tagging
+        # When hybrid is True, names that are unlikely to be part of other
+        # words (see is_unambiguous_name) are replaced as plain strings
+        # before the text is tagged, and only the remaining names are
+        # replaced in the tagged text. This is faster, but can differ from
+        # the tokenized replacement when a name is part of a longer word,
+        # or overlaps with a name that comes before it in the plan.
+        self.hybrid = hybrid
+        self.name_recognizer = BasicNamedEntityRecognizer() if hybrid else None
+        # Counts of the name operations applied as plain strings for each
+        # name rule in the current run of tokenized rules, by operation index
+        self.string_name_operation_counts:Dict[int, Dict[int, int]] = {}
+        # Name operations replaced as plain strings in hybrid mode, and
+        # name operations replaced in the tagged text
+        self.total_string_operations = 0
+        self.total_tokenized_operations = 0
+        # When columnar_sentences is True, the text is tagged as a 
+        # ColumnarSentence, and tokenized replacements are made on its 
+        # columns, which uses far less memory for long texts. When None,
+        # the tagger's own setting is used.
+        self.columnar_sentences = columnar_sentences
         
+    # Tokenized replacements only edit self.sentence_builder, and mark
+    # the plain text as dirty. The plain text is joined from the tagged
+    # text the next time it is read, rather than after every edit.
+    @property
+    def text(self) -> str:
+        if self._text_is_dirty:
+            self._text = str(self.sentence_builder)
+            self._text_is_dirty = False
+        return self._text
+
+    @text.setter
+    def text(self, text:str):
+        self._text = text
+        self._text_is_dirty = False
+
+    @property
+    def tagged_text(self) -> Optional[Sentence]:
+        if self.sentence_builder is None:
+            return None
+        return self.sentence_builder.build()
+
+    @tagged_text.setter
+    def tagged_text(self, tagged_text:Optional[Sentence]):
+        # Materialize any pending edits before replacing the builder
+        # that they were made in
+        self.text = self.text
+        if tagged_text is None:
+            self.sentence_builder = None
+        else:
+            self.sentence_builder = SentenceBuilder(tagged_text, index_words=True)
+
     def _log(self, text:str):
         if self.verbose:
             print(text)
@@ -109,31 +193,54 @@ class NLP_MTL_Preprocess:
         self.total_replacements += n
         return n 
 
+    # Applies a group of non-tokenized replacements in table order,
+    # returning the number of replacements made for each entry
+    def replace_words(self, replacements:dict) -> List[int]:
+        replacer = compile_replacements(tuple(replacements.items()))
+        self.text, counts = replacer.replace(self.text)
+        self.total_replacements += sum(counts)
+        return counts
+
     def replace_tokenized_phrase(self, old_phrase, replacement):
-        n = self.tagged_text.count(old_phrase)
-        if n == 0:
-            return 0
         replacement_word = Word(replacement, "NA")
-        self.tagged_text = self.tagged_text.replace_multi_word_sequence(
+        n = self.sentence_builder.replace_and_count(
             old_phrase, 
             replacement_word
         )
-        self.text = str(self.tagged_text)
-        self.total_replacements += n
+        self._record_tokenized_replacements(n)
         return n
 
+    # Replaces a group of phrases in as few passes over the tagged text
+    # as possible, with earlier phrases taking precedence over later ones.
+    # Returns the number of replacements made for each phrase.
+    def replace_tokenized_phrases(self, phrases:List[Tuple[str, str]]) -> List[int]:
+        phrase_matcher = compile_phrases(tuple([
+            (old_phrase, Word(replacement, "NA")) for old_phrase, replacement in phrases
+        ]))
+        counts = self.sentence_builder.apply_phrases(phrase_matcher)
+        self._record_tokenized_replacements(sum(counts))
+        return counts
+
+    # Replaces a group of single words in one pass over the tagged text,
+    # returning the number of replacements made for each word
+    def replace_tokenized_single_words(self, replacements:List[Tuple[Word, str]]) -> List[int]:
+        counts = self.sentence_builder.replace_words_and_count(replacements)
+        self._record_tokenized_replacements(sum(counts))
+        return counts
+
     def replace_tokenized_single_word(self, old_word, replacement_text):
-        n = self.tagged_text.count_word(old_word)
-        if n == 0:
-            return 0
-        self.tagged_text = self.tagged_text.replace_word(
+        n = self.sentence_builder.replace_word_and_count(
             old_word, 
             replacement_text
         )
-        self.text = str(self.tagged_text)
-        self.total_replacements += n
+        self._record_tokenized_replacements(n)
         return n
 
+    def _record_tokenized_replacements(self, replacement_count:int):
+        if replacement_count > 0:
+            self.total_replacements += replacement_count
+            self._text_is_dirty = True
+
     @classmethod
     def generate_name_list_from_replacement_table(cls, replacement_table) -> List[str]:
         compiled_name_set = set()
@@ -197,99 +304,369 @@ class NLP_MTL_Preprocess:
                    Names.LAST_NAME in honorific)
 
 
-    def replace_name(self, 
-                character: Character, 
-                replace: Names, 
-                no_honorific: Names, 
-                replaced_names: dict
-            ):
-        for en_name, jp_name, no_honor in self.loop_names(character, replace, no_honorific):
-            if jp_name in replaced_names:
+    @classmethod
+    def compile_replacement_plan(cls, replacement_table) -> ReplacementPlan:
+        operations = []
+        rule_indexes = []
+        # Each name variant is only replaced by the first rule that
+        # generates it
+        replaced_names = set()
+        honorifics_replacements = replacement_table.get('honorifics')
+        for rule_index, rule in enumerate(cls.rules):
+            if rule.json_key not in replacement_table:
                 continue
-            honorifics_replacement_counts = dict()
-            honorifics_replacements = self.replacement_table.get('honorifics')
-            if honorifics_replacements is not None:
-                # The replacement table contains honorifics in the format:
-                #
-                # jp_honorific (str): en_honorific (str)
-                # "先輩": "senpai"
-                for jp_honorific, en_honorific in honorifics_replacements.items():
-                    honorifics_replacement_counts[en_honorific] = self.replace_tokenized_phrase(
-                        f'{jp_name}{jp_honorific}',
-                        f'{en_name}-{en_honorific}'
-                    )
-            # The presence of honorifics is a good sanity check for whether the
-            # string being replaced is a name or not. If there are no honorifics
-            # and single_kanji_filter is True, single kanji names will not be
-            # replaced, presumably because of the greater risk of false-positive
-            # replacements
-            if no_honor:
-                if len(jp_name) > 1:
-                    honorifics_replacement_counts['NA'] = self.replace_tokenized_phrase(jp_name, en_name)
-                elif not self.single_kanji_filter:
-                    # Allow replacing single kanji words that have been tagged
-                    # as being proper nouns.
-                    honorifics_replacement_counts['NA'] = self.replace_tokenized_single_word(
-                        Word(jp_name, PartOfSpeech.PROPER_NOUN),
-                        en_name
+            rule_indexes.append(rule_index)
+            if not rule.is_name:
+                for old_word, replacement in replacement_table[rule.json_key].items():
+                    operations.append(ReplacementOperation(rule_index, old_word, replacement))
+                continue
+            for en_name, jp_name in replacement_table[rule.json_key].items():
+                # If jp_name is a list of multiple name parts, combine 
+                # them into a single space-delimited string
+                if isinstance(jp_name, list):
+                    jp_name = " ".join(jp_name)
+                char = Character(jp_name, en_name)
+                if len(jp_name.split(" ")) != len(en_name.split(" ")):
+                    raise ValueError(f"Names do not match for {rule.json_key} entry: {char}")
+                for en_name_variant, jp_name_variant, no_honor in cls.loop_names(
+                        char, rule.replace_name, rule.no_honorifics
+                    ):
+                    if jp_name_variant in replaced_names:
+                        continue
+                    replaced_names.add(jp_name_variant)
+                    if honorifics_replacements is not None:
+                        # The replacement table contains honorifics in the format:
+                        #
+                        # jp_honorific (str): en_honorific (str)
+                        # "先輩": "senpai"
+                        for jp_honorific, en_honorific in honorifics_replacements.items():
+                            operations.append(ReplacementOperation(
+                                rule_index=rule_index,
+                                pattern=f'{jp_name_variant}{jp_honorific}',
+                                replacement=f'{en_name_variant}-{en_honorific}',
+                                honorific=en_honorific,
+                                jp_name=jp_name_variant,
+                                en_name=en_name_variant,
+                            ))
+                    # The presence of honorifics is a good sanity check for whether the
+                    # string being replaced is a name or not. Names without honorifics
+                    # that are a single kanji long are only replaced if the single kanji
+                    # filter is disabled, presumably because of the greater risk of 
+                    # false-positive replacements
+                    if no_honor:
+                        operations.append(ReplacementOperation(
+                            rule_index=rule_index,
+                            pattern=jp_name_variant,
+                            replacement=en_name_variant,
+                            honorific='NA',
+                            is_single_kanji=len(jp_name_variant) <= 1,
+                            jp_name=jp_name_variant,
+                            en_name=en_name_variant,
+                        ))
+        return ReplacementPlan(
+            operations=operations,
+            rule_indexes=rule_indexes,
+            table_hash=ReplacementPlan.hash_replacement_table(replacement_table),
+        )
+
+    # Loads the compiled plan for a replacement table from the plan
+    # cache, compiling it if necessary
+    @classmethod
+    def load_replacement_plan(cls, replacement_table) -> ReplacementPlan:
+        return ReplacementPlan.load_or_compile(
+            plan_name="nlp",
+            replacement_table=replacement_table,
+            compile_plan=cls.compile_replacement_plan,
+        )
+
+    # Applies the operations of a name rule in order, and returns the
+    # number of replacements made for each operation, or None for single
+    # kanji operations skipped by the single kanji filter.
+    #
+    # Consecutive phrase operations are applied together. Single kanji
+    # operations are deferred and applied together in a single pass over
+    # the tagged text, as long as no operation in between could be
+    # affected by the order they are applied in.
+    def replace_name_operations(self, operations:List[ReplacementOperation]) -> List[Optional[int]]:
+        replacement_counts:List[Optional[int]] = [None] * len(operations)
+        pending_phrase_indexes = []
+        pending_single_kanji_indexes = []
+        # Names and replacements of the pending single kanji operations
+        pending_single_kanji_texts = set()
+
+        def apply_pending_operations():
+            if len(pending_phrase_indexes) > 0:
+                phrase_counts = self.replace_tokenized_phrases([
+                    (operations[i].pattern, operations[i].replacement) 
+                    for i in pending_phrase_indexes
+                ])
+                for i, count in zip(pending_phrase_indexes, phrase_counts):
+                    replacement_counts[i] = count
+                pending_phrase_indexes.clear()
+            if len(pending_single_kanji_indexes) > 0:
+                # Allow replacing single kanji words that have been tagged
+                # as being proper nouns.
+                single_kanji_counts = self.replace_tokenized_single_words([
+                    (
+                        intern_word(operations[i].pattern, PartOfSpeech.PROPER_NOUN),
+                        operations[i].replacement
                     )
-            total = sum(honorifics_replacement_counts.values())
-            replaced_names[jp_name] = total
-            if total > 0: 
-                replaced_honorifics_str = ", ".join([
-                    f'{honorific}-{replacement_count}' for honorific, replacement_count 
-                    in honorifics_replacement_counts.items() if replacement_count > 0
+                    for i in pending_single_kanji_indexes
+                ])
+                for i, count in zip(pending_single_kanji_indexes, single_kanji_counts):
+                    replacement_counts[i] = count
+                pending_single_kanji_indexes.clear()
+                pending_single_kanji_texts.clear()
+
+        for i, operation in enumerate(operations):
+            if operation.is_single_kanji:
+                if self.single_kanji_filter:
+                    continue
+                # A pending operation's replacement could be replaced by
+                # this operation
+                if operation.pattern in pending_single_kanji_texts:
+                    apply_pending_operations()
+                pending_single_kanji_indexes.append(i)
+                pending_single_kanji_texts.add(operation.pattern)
+                pending_single_kanji_texts.add(operation.replacement)
+            else:
+                # The phrase could match the name or replacement of a
+                # pending single kanji operation, so those have to be
+                # applied first
+                if any(text in operation.pattern for text in pending_single_kanji_texts):
+                    apply_pending_operations()
+                pending_phrase_indexes.append(i)
+        apply_pending_operations()
+        return replacement_counts
+
+    # Starts a run of consecutive tokenized rules at rule_index, by
+    # finding the operations of each of its name rules that could make a
+    # replacement in the current text and discarding any tagged text
+    def start_tokenized_rules(self, rule_index:int):
+        self.tagged_text = None
+        name_rule_indexes = []
+        for i in range(rule_index, len(NLP_MTL_Preprocess.rules)):
+            rule = NLP_MTL_Preprocess.rules[i]
+            if not rule.is_tokenized_replacement:
+                break
+            if rule.is_name and self.replacement_plan.has_rule(i):
+                name_rule_indexes.append(i)
+        self.string_name_operation_counts = {}
+        if self.hybrid:
+            self.replace_string_name_operations(name_rule_indexes)
+        name_presence_filter = NamePresenceFilter(self.text)
+        self.present_name_operation_indexes = {}
+        for i in name_rule_indexes:
+            operations = self.replacement_plan.get_rule_operations(i)
+            string_operation_indexes = self.string_name_operation_counts.get(i, {})
+            tokenized_operation_indexes = [
+                j for j in range(len(operations)) if j not in string_operation_indexes
+            ]
+            self.present_name_operation_indexes[i] = [
+                tokenized_operation_indexes[j] for j in name_presence_filter.filter([
+                    operations[k] for k in tokenized_operation_indexes
                 ])
-                self._log(f'    {en_name} :{total} ({replaced_honorifics_str})')
+            ]
+
+    # Names that are multiple katakana characters long, but are not a 
+    # known katakana word, are almost never part of another word, as long
+    # as they are never next to other katakana in the text
+    def is_unambiguous_name(self, operation:ReplacementOperation) -> bool:
+        jp_name = operation.jp_name
+        return jp_name is not None and \
+            len(jp_name) >= HYBRID_MIN_NAME_LENGTH and \
+            self.name_recognizer.is_name(jp_name) and \
+            not self._occurs_next_to_katakana(operation.pattern)
+
+    def _occurs_next_to_katakana(self, pattern:str) -> bool:
+        if len(pattern) == 0:
+            return True
+        check_end = is_katakana(pattern[-1])
+        i = self.text.find(pattern)
+        while i != -1:
+            j = i + len(pattern)
+            if i > 0 and is_katakana(self.text[i - 1]):
+                return True
+            if check_end and j < len(self.text) and is_katakana(self.text[j]):
+                return True
+            i = self.text.find(pattern, i + 1)
+        return False
+
+    # Applies the operations for unambiguous names of each of the name
+    # rules as plain string replacements, in plan order and in as few
+    # passes over the text as possible. The counts are recorded in 
+    # self.string_name_operation_counts, and added to the total when
+    # each rule is applied.
+    def replace_string_name_operations(self, rule_indexes:List[int]):
+        # (rule index, operation index) of each replacement
+        replacement_sources = []
+        replacements = []
+        # Patterns in the text that are left to the tokenized replacement.
+        # A name inside one of them must be too, so that the earlier
+        # pattern is still replaced first.
+        tokenized_patterns = set()
+        # Most names never appear in a chapter, and are left for the
+        # presence filter to skip
+        jp_name_presence:Dict[str, bool] = {}
+        for rule_index in rule_indexes:
+            self.string_name_operation_counts[rule_index] = {}
+            for i, operation in enumerate(self.replacement_plan.get_rule_operations(rule_index)):
+                jp_name = operation.jp_name
+                if jp_name is None:
+                    continue
+                jp_name_is_present = jp_name_presence.get(jp_name)
+                if jp_name_is_present is None:
+                    jp_name_is_present = jp_name in self.text
+                    jp_name_presence[jp_name] = jp_name_is_present
+                if not jp_name_is_present or operation.pattern not in self.text:
+                    continue
+                if self.is_unambiguous_name(operation) and \
+                   not any(operation.pattern in pattern for pattern in tokenized_patterns):
+                    replacement_sources.append((rule_index, i))
+                    replacements.append((operation.pattern, operation.replacement))
+                else:
+                    tokenized_patterns.add(operation.pattern)
+        if len(replacements) == 0:
+            return
+        replacer = compile_replacements(tuple(replacements))
+        self.text, counts = replacer.replace(self.text)
+        for (rule_index, i), count in zip(replacement_sources, counts):
+            self.string_name_operation_counts[rule_index][i] = count
+
+    # Applies the operations of a name rule that could make a replacement
+    # in the text, tagging the text first if it hasn't been tagged yet.
+    # Returns the same counts as replace_name_operations.
+    def replace_present_name_operations(self, rule_index:int) -> List[Optional[int]]:
+        operations = self.replacement_plan.get_rule_operations(rule_index)
+        replacement_counts:List[Optional[int]] = [
+            None if operation.is_single_kanji and self.single_kanji_filter else 0
+            for operation in operations
+        ]
+        string_operation_counts = self.string_name_operation_counts.get(rule_index, {})
+        for i, count in string_operation_counts.items():
+            replacement_counts[i] = count
+            self.total_replacements += count
+        self.total_string_operations += len(string_operation_counts)
+        present_operation_indexes = self.present_name_operation_indexes[rule_index]
+        self.total_tokenized_operations += len(present_operation_indexes)
+        skipped_operation_count = len(operations) - len(string_operation_counts) - \
+            len(present_operation_indexes)
+        if skipped_operation_count > 0:
+            self.total_skipped_operations += skipped_operation_count
+            self._log(f'  Skipped {skipped_operation_count} operations for names not in the text')
+        if len(present_operation_indexes) == 0:
+            return replacement_counts
+        if self.sentence_builder is None:
+            self._tag_text()
+        present_operation_counts = self.replace_name_operations([
+            operations[i] for i in present_operation_indexes
+        ])
+        for i, count in zip(present_operation_indexes, present_operation_counts):
+            replacement_counts[i] = count
+        return replacement_counts
+
+    def _tag_text(self):
+        self._log("No valid tagged text found. Tagging text.")
+        if self.windowed_tagging:
+            tagged_line_indexes = self._find_name_line_indexes()
+            if tagged_line_indexes is not None:
+                self._log(f"Tagging {len(tagged_line_indexes)} lines containing names.")
+            self.tagged_text = self.tagger.tag(
+                self.text, 
+                tagged_line_indexes, 
+                columnar_sentences=self.columnar_sentences
+            )
+        else:
+            self.tagged_text = self.tagger.tag(
+                self.text, 
+                columnar_sentences=self.columnar_sentences
+            )
+        self._log("Tagged text.")
+
+    # Returns the indexes of the lines that contain an occurrence of any
+    # of the present name operations' patterns, or None if every line
+    # needs to be tagged
+    def _find_name_line_indexes(self) -> Optional[Set[int]]:
+        patterns = set()
+        for rule_index, operation_indexes in self.present_name_operation_indexes.items():
+            operations = self.replacement_plan.get_rule_operations(rule_index)
+            for i in operation_indexes:
+                patterns.add(operations[i].pattern)
+        # Patterns that span lines (or are empty) could match words from
+        # any line
+        if any(len(pattern) == 0 or "\n" in pattern for pattern in patterns):
+            return None
+        text = self.text
+        line_starting_indexes = [0]
+        newline_index = text.find("\n")
+        while newline_index != -1:
+            line_starting_indexes.append(newline_index + 1)
+            newline_index = text.find("\n", newline_index + 1)
+        line_indexes = set()
+        for pattern in patterns:
+            match_index = text.find(pattern)
+            while match_index != -1:
+                line_indexes.add(bisect_right(line_starting_indexes, match_index) - 1)
+                match_index = text.find(pattern, match_index + 1)
+        return line_indexes
+
+    def _log_name_variant(self, operations:List[ReplacementOperation], replacement_counts:List[Optional[int]]):
+        honorifics_replacement_counts = dict()
+        for operation, replacement_count in zip(operations, replacement_counts):
+            if replacement_count is not None:
+                honorifics_replacement_counts[operation.honorific] = replacement_count
+        total = sum(honorifics_replacement_counts.values())
+        if total > 0: 
+            replaced_honorifics_str = ", ".join([
+                f'{honorific}-{replacement_count}' for honorific, replacement_count 
+                in honorifics_replacement_counts.items() if replacement_count > 0
+            ])
+            self._log(f'    {operations[0].en_name} :{total} ({replaced_honorifics_str})')
 
     def replace(self) -> str:
-        replaced_names = dict()
         time_start = time.time()
         prev_rule = None
-        for rule in NLP_MTL_Preprocess.rules:
+        for rule_index, rule in enumerate(NLP_MTL_Preprocess.rules):
             prev_count = self.total_replacements
             self._log(f'* {rule.title} Replacements:')
-            if rule.json_key in self.replacement_table:
+            if self.replacement_plan.has_rule(rule_index):
                 # Retag text after each non-tokenized replacement, as
                 # rules that directly modify self.text won't be 
                 # in self.tagged_text
                 if rule.is_tokenized_replacement:
                     self._log("Starting tokenized replace rule")
-                    if not self.tagged_text or \
+                    if self.present_name_operation_indexes is None or \
                        not prev_rule or \
                        not prev_rule.is_tokenized_replacement:
-                        self._log("No valid tagged text found. Tagging text.")
-                        self.tagged_text = self.tagger.tag(self.text)
-                        self._log("Tagged text.")
-                    else:
+                        self.start_tokenized_rules(rule_index)
+                    elif self.sentence_builder is not None:
                         self._log("Valid tagged text found.")
+                operations = self.replacement_plan.get_rule_operations(rule_index)
                 if rule.is_name:
-                    # The replacement table contains the names of characters 
-                    # with a single name in the format:
-                    #
-                    # en_name (str): jp_name (str)
-                    # "Aldebaran": "アルデバラン",
-                    #
-                    # The replacement table contains the names of characters 
-                    # with multi-part names in the format:
-                    #
-                    # en_name (str): jp_name (List[str])
-                    # "Capella Emerada Lugunica": ["カペラ", "エメラダ", "ルグニカ"],
-                    for en_name, jp_name in self.replacement_table[rule.json_key].items():
-                        # If jp_name is a list of multiple name parts, combine 
-                        # them into a single space-delimited string
-                        if isinstance(jp_name, list):
-                            jp_name = " ".join(jp_name)
-                        char = Character(jp_name, en_name)
-                        self.replace_name(char, rule.replace_name, rule.no_honorifics, replaced_names)
+                    replacement_counts = self.replace_present_name_operations(rule_index)
+                    # Operations for each name variant are consecutive
+                    # in the plan
+                    for _, variant_operations_and_counts in itertools.groupby(
+                            zip(operations, replacement_counts), 
+                            key=lambda operation_and_count: operation_and_count[0].jp_name
+                        ):
+                        variant_operations, variant_counts = zip(*variant_operations_and_counts)
+                        self._log_name_variant(variant_operations, variant_counts)
                 else:
-                   for old_word, replacement in self.replacement_table[rule.json_key].items():
-                        n = self.replace_single_word(old_word, replacement)
+                    replacements = {
+                        operation.pattern: operation.replacement for operation in operations
+                    }
+                    counts = self.replace_words(replacements)
+                    for (old_word, replacement), n in zip(replacements.items(), counts):
                         if n > 0:
                             self._log(f'    {old_word} → {replacement}:{n}')
             prev_rule = rule
             self._log(f'  SubTotal: {self.total_replacements-prev_count}')
 
+        self._log(f'Skipped Operations: {self.total_skipped_operations}')
+        if self.hybrid:
+            self._log(f'String Operations: {self.total_string_operations}')
+            self._log(f'Tokenized Operations: {self.total_tokenized_operations}')
         time_end = time.time()
         print(f'Total Replacements: {self.total_replacements}')
         print(f'Time Taken: {time_end-time_start} seconds')
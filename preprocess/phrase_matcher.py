@@ -0,0 +1,176 @@
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from preprocess.sentence import Word
+
+# Index of the trie node fields
+_CHILDREN = 0
+_PHRASE_INDEX = 1
+
+# Replaces sequences of whole words matching any of an ordered list of
+# phrases, with the same result as applying the phrases one at a time
+# with Sentence.replace_multi_word_sequence.
+#
+# The phrases are compiled into a character trie, which is walked one
+# whole word at a time from each word in the sentence, so that every
+# occurrence of every phrase that starts and ends on a word boundary is
+# found in a single walk over the words. Applying the phrases one at a
+# time gives earlier phrases priority over later ones, so occurrences
+# are then assigned in phrase order, skipping any occurrence that
+# overlaps one that has already been assigned.
+#
+# This relies on a phrase never matching the words introduced by an
+# earlier replacement, so phrases that contain the text of an earlier
+# replacement are put into a separate batch and matched in a later walk.
+class PhraseMatcher:
+    def __init__(self, phrases:Iterable[Tuple[str, Word]]):
+        self._phrases = list(phrases)
+        self._batches = self._build_batches()
+        self._batch_tries = [self._build_trie(batch) for batch in self._batches]
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+    @property
+    def batch_count(self) -> int:
+        return len(self._batches)
+
+    # Returns the new list of words along with the number of
+    # replacements made for each phrase, in the order they were provided
+    def apply(self, words:Sequence[Word]) -> Tuple[List[Word], List[int]]:
+        counts = [0] * len(self._phrases)
+        for batch_index in range(self.batch_count):
+            replacements = self.find_batch_replacements(batch_index, words, counts)
+            if len(replacements) > 0:
+                words = _rebuild_word_list(words, replacements)
+        return list(words), counts
+
+    # Finds the replacements made by the phrases in a single batch, as a
+    # list of (starting index, ending index, replacement word) in order of
+    # position, and adds them to the per-phrase counts. Entries in words
+    # may be None to mark words that have been removed, which are skipped
+    # over when matching phrases (see SentenceBuilder).
+    #
+    # If the indexes of the only words that could start a phrase are
+    # already known (see get_batch_first_chars), they can be passed as
+    # starting_indexes, in any order, to avoid checking every word.
+    def find_batch_replacements(
+        self, 
+        batch_index:int, 
+        words:Sequence[Optional[Word]], 
+        counts:List[int],
+        starting_indexes:Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, int, Word]]:
+        trie = self._batch_tries[batch_index]
+        root_children = trie[_CHILDREN]
+        word_count = len(words)
+        if starting_indexes is None:
+            starting_indexes = range(word_count)
+        # (phrase_index, starting word index, ending word index)
+        occurrences = []
+        for i in starting_indexes:
+            word = words[i]
+            # Most words can't start a phrase, so check the first
+            # character before walking the trie
+            if word is None or len(word.text) == 0 or word.text[0] not in root_children:
+                continue
+            # Follow the trie one whole word at a time, recording each
+            # phrase that ends on a word boundary
+            node = trie
+            j = i
+            while j < word_count:
+                following_word = words[j]
+                j += 1
+                if following_word is None:
+                    continue
+                following_word_text = following_word.text
+                for char in following_word_text:
+                    node = node[_CHILDREN].get(char)
+                    if node is None:
+                        break
+                if node is None:
+                    break
+                # Empty words can't complete a phrase that wasn't already
+                # complete
+                if len(following_word_text) > 0 and node[_PHRASE_INDEX] is not None:
+                    occurrences.append((node[_PHRASE_INDEX], i, j))
+        if len(occurrences) == 0:
+            return []
+        # Assign occurrences in phrase order, and from left to right for
+        # each phrase
+        occurrences.sort()
+        replaced_words = bytearray(word_count)
+        replacements = []
+        for phrase_index, starting_index, ending_index in occurrences:
+            if any(replaced_words[starting_index:ending_index]):
+                continue
+            replaced_words[starting_index:ending_index] = b"\x01" * (ending_index - starting_index)
+            replacements.append((starting_index, ending_index, self._phrases[phrase_index][1]))
+            counts[phrase_index] += 1
+        replacements.sort(key=lambda replacement: replacement[0])
+        return replacements
+
+    # Characters that phrases in the batch can start with
+    def get_batch_first_chars(self, batch_index:int) -> Iterable[str]:
+        return self._batch_tries[batch_index][_CHILDREN].keys()
+
+    def _build_batches(self) -> List[List[int]]:
+        batches = []
+        current_batch = []
+        # Text of the words introduced by the replacements in the current
+        # batch. A replacement word can only be part of a later phrase's
+        # match if the phrase contains the word's entire text.
+        current_batch_replacement_texts = set()
+        for i, (phrase, replacement_word) in enumerate(self._phrases):
+            if len(current_batch) > 0 and \
+               _contains_any(phrase, current_batch_replacement_texts):
+                batches.append(current_batch)
+                current_batch = []
+                current_batch_replacement_texts = set()
+            current_batch.append(i)
+            current_batch_replacement_texts.add(replacement_word.text)
+        if len(current_batch) > 0:
+            batches.append(current_batch)
+        return batches
+
+    def _build_trie(self, batch:List[int]) -> list:
+        root = [{}, None]
+        for phrase_index in batch:
+            phrase = self._phrases[phrase_index][0]
+            # Empty phrases never match a sequence of words
+            if len(phrase) == 0:
+                continue
+            node = root
+            for char in phrase:
+                node = node[_CHILDREN].setdefault(char, [{}, None])
+            # Only the first of any duplicate phrases can match
+            if node[_PHRASE_INDEX] is None:
+                node[_PHRASE_INDEX] = phrase_index
+        return root
+
+def _rebuild_word_list(words:Sequence[Word], replacements:List[Tuple[int, int, Word]]) -> List[Word]:
+    new_word_list = []
+    previous_ending_index = 0
+    for starting_index, ending_index, replacement_word in replacements:
+        new_word_list += words[previous_ending_index:starting_index]
+        new_word_list.append(replacement_word)
+        previous_ending_index = ending_index
+    new_word_list += words[previous_ending_index:]
+    return new_word_list
+
+# Returns True if any of the strings in substrings appears in text
+def _contains_any(text:str, substrings:set) -> bool:
+    # Every string contains the empty string
+    if "" in substrings:
+        return True
+    for i in range(len(text)):
+        for j in range(i + 1, len(text) + 1):
+            if text[i:j] in substrings:
+                return True
+    return False
+
+# Replacement tables are the same for every chapter in a run, so the
+# compiled matchers are reused rather than rebuilt per chapter
+@lru_cache(maxsize=128)
+def compile_phrases(phrases:Tuple[Tuple[str, Word], ...]) -> PhraseMatcher:
+    return PhraseMatcher(phrases)
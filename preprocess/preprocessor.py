@@ -12,7 +12,7 @@ from preprocess.nlp_mtl_preprocess import NLP_MTL_Preprocess
 from preprocess.mtl_preprocess import MTL_Preprocess
 from preprocess.tokenizer.fugashi_tokenizer import FugashiTokenizer
 from preprocess.tokenizer.sudachi_tokenizer import SudachiTokenizer
-from preprocess.tokenizer.spacy_tokenizer import SpacyTokenizer
+from preprocess.tokenizer.spacy_tokenizer import DEFAULT_SPACY_MODEL, SPACY_MODELS, SpacyTokenizer
 from preprocess.tagger import Tagger
 from preprocess.tools.mecab_dict_generator import MecabDictGenerator
 from preprocess.tools.sudachi_dict_generator import SudachiDictGenerator
@@ -27,6 +27,13 @@ class PreprocessorEnvConfig:
         use_user_dict:Optional[bool]=False,
         user_dic_path:Optional[str]=None,
         use_single_kanji_filter:Optional[bool]=False,
+        spacy_model:Optional[str]=DEFAULT_SPACY_MODEL,
+        columnar_sentences:Optional[bool]=False,
+        windowed_tagging:Optional[bool]=False,
+        hybrid:Optional[bool]=False,
+        tokenization_chunk_size:Optional[int]=None,
+        spacy_batch_size:Optional[int]=None,
+        spacy_n_process:Optional[int]=1,
     ):
         self.tokenizer = tokenizer
         self.replacement_table_json = replacement_table_json
@@ -34,6 +41,13 @@ class PreprocessorEnvConfig:
         self.use_user_dict = use_user_dict
         self.user_dic_path = user_dic_path
         self.use_single_kanji_filter = use_single_kanji_filter
+        self.spacy_model = spacy_model
+        self.columnar_sentences = columnar_sentences
+        self.windowed_tagging = windowed_tagging
+        self.hybrid = hybrid
+        self.tokenization_chunk_size = tokenization_chunk_size
+        self.spacy_batch_size = spacy_batch_size
+        self.spacy_n_process = spacy_n_process
 
     def write_env(self):
         env_rows = [
@@ -43,6 +57,13 @@ class PreprocessorEnvConfig:
             f"{self.ENV_PREFIX}_USE_USER_DICT={self.use_user_dict}",
             f"{self.ENV_PREFIX}_USER_DICT_PATH={self.user_dic_path}",
             f"{self.ENV_PREFIX}_USE_SINGLE_KANJI_FILTER={self.use_single_kanji_filter}",
+            f"{self.ENV_PREFIX}_SPACY_MODEL={self.spacy_model}",
+            f"{self.ENV_PREFIX}_COLUMNAR_SENTENCES={self.columnar_sentences}",
+            f"{self.ENV_PREFIX}_WINDOWED_TAGGING={self.windowed_tagging}",
+            f"{self.ENV_PREFIX}_HYBRID={self.hybrid}",
+            f"{self.ENV_PREFIX}_TOKENIZATION_CHUNK_SIZE={self.tokenization_chunk_size}",
+            f"{self.ENV_PREFIX}_SPACY_BATCH_SIZE={self.spacy_batch_size}",
+            f"{self.ENV_PREFIX}_SPACY_N_PROCESS={self.spacy_n_process}",
         ]
         with open(".env", "w") as env_file:
             env_file.write("\n".join(env_rows))
@@ -54,6 +75,9 @@ class PreprocessorEnvConfig:
         tag_potential_proper_nouns = os.getenv(f"{cls.ENV_PREFIX}_TAG_POTENTIAL_PROPER_NOUNS")=='True'
         use_user_dict = os.getenv(f"{cls.ENV_PREFIX}_USE_USER_DICT")=='True'
         use_user_dict = os.getenv(f"{cls.ENV_PREFIX}_USE_SINGLE_KANJI_FILTER")=='True'
+        columnar_sentences = os.getenv(f"{cls.ENV_PREFIX}_COLUMNAR_SENTENCES")=='True'
+        windowed_tagging = os.getenv(f"{cls.ENV_PREFIX}_WINDOWED_TAGGING")=='True'
+        hybrid = os.getenv(f"{cls.ENV_PREFIX}_HYBRID")=='True'
         return PreprocessorEnvConfig(
             tokenizer=os.getenv(f"{cls.ENV_PREFIX}_TOKENIZER"),
             replacement_table_json=os.getenv(f"{cls.ENV_PREFIX}_REPLACEMENT_TABLE_JSON"),
@@ -61,8 +85,23 @@ class PreprocessorEnvConfig:
             use_user_dict=use_user_dict, 
             user_dic_path=os.getenv(f"{cls.ENV_PREFIX}_USER_DICT_PATH"),
             use_single_kanji_filter=use_user_dict,
+            spacy_model=os.getenv(f"{cls.ENV_PREFIX}_SPACY_MODEL", DEFAULT_SPACY_MODEL),
+            columnar_sentences=columnar_sentences,
+            windowed_tagging=windowed_tagging,
+            hybrid=hybrid,
+            tokenization_chunk_size=cls._getenv_int("TOKENIZATION_CHUNK_SIZE"),
+            spacy_batch_size=cls._getenv_int("SPACY_BATCH_SIZE"),
+            spacy_n_process=cls._getenv_int("SPACY_N_PROCESS", 1),
         )
 
+    # Unset settings are written as None
+    @classmethod
+    def _getenv_int(cls, name:str, default:Optional[int]=None) -> Optional[int]:
+        value = os.getenv(f"{cls.ENV_PREFIX}_{name}")
+        if value is None or value in ("", "None"):
+            return default
+        return int(value)
+
 
 def out_filename_generator(in_filename):
     p, e = os.path.splitext(in_filename)
@@ -137,24 +176,39 @@ def run_nlp_mtl_preprocessor(args):
             tokenizer = SudachiTokenizer()
     elif env_config.tokenizer == "spacy":
         if env_config.use_user_dict:
-            tokenizer = SpacyTokenizer(user_dic_path=env_config.user_dic_path)
+            tokenizer = SpacyTokenizer(
+                user_dic_path=env_config.user_dic_path,
+                model=env_config.spacy_model,
+                batch_size=env_config.spacy_batch_size,
+                n_process=env_config.spacy_n_process,
+            )
         else:
-            tokenizer = SpacyTokenizer()
+            tokenizer = SpacyTokenizer(
+                model=env_config.spacy_model,
+                batch_size=env_config.spacy_batch_size,
+                n_process=env_config.spacy_n_process,
+            )
     else:
         raise ValueError(f"Received unexpected tokenizer: {env_config.tokenizer}")
     replacement_table = load_replacement_table(env_config.replacement_table_json)
+    replacement_plan = NLP_MTL_Preprocess.load_replacement_plan(replacement_table)
     proper_noun_list = NLP_MTL_Preprocess.generate_name_list_from_replacement_table(replacement_table)
     tagger = Tagger(
         tokenizer=tokenizer,
         tag_potential_proper_nouns=env_config.tag_potential_proper_nouns,
         proper_noun_list=proper_noun_list,
+        tokenization_chunk_size=env_config.tokenization_chunk_size,
     )
     preprocess = NLP_MTL_Preprocess(
         text=text, 
         tagger=tagger, 
         replacement_table=replacement_table,
         verbose=args.verbose,
-        single_kanji_filter=env_config.use_single_kanji_filter
+        single_kanji_filter=env_config.use_single_kanji_filter,
+        replacement_plan=replacement_plan,
+        columnar_sentences=env_config.columnar_sentences,
+        windowed_tagging=env_config.windowed_tagging,
+        hybrid=env_config.hybrid,
     )
     preprocessed_text = preprocess.replace()    
     out_filename = out_filename_generator(args.input_file)
@@ -162,6 +216,18 @@ def run_nlp_mtl_preprocessor(args):
         outfile.write(preprocessed_text)
     print(f'Output written to: {out_filename}')
 
+def parse_optional_int(answer:Optional[str]) -> Optional[int]:
+    if answer is None or answer.strip() == "":
+        return None
+    return int(answer)
+
+def validate_optional_positive_int(_, answer:str) -> bool:
+    try:
+        value = parse_optional_int(answer)
+    except ValueError:
+        return False
+    return value is None or value > 0
+
 def setup_nlp_mtl_preprocessor():
     initial_questions = [
         inquirer.List(
@@ -189,12 +255,57 @@ def setup_nlp_mtl_preprocessor():
             message="Use user dictionary",
             choices=['Yes', "No"]
         ),
+        inquirer.List(
+            'columnar_sentences',
+            message="Store tagged text in columns to reduce memory use",
+            choices=['No', "Yes"]
+        ),
+        inquirer.List(
+            'windowed_tagging',
+            message="Only tag the lines that contain names",
+            choices=['No', "Yes"]
+        ),
+        inquirer.List(
+            'hybrid',
+            message="Replace unambiguous katakana names before tagging (faster, may differ slightly)",
+            choices=['No', "Yes"]
+        ),
+        inquirer.Text(
+            'tokenization_chunk_size',
+            message="Characters of consecutive lines to tokenize together (blank to tokenize each line on its own)",
+            validate=validate_optional_positive_int
+        ),
     ]
     initial_answers = inquirer.prompt(initial_questions)
     use_user_dict = True if initial_answers['use_user_dict'] == "Yes" else False
     use_single_kanji_filter = True if initial_answers['use_single_kanji_filter'] == "Yes" else False
     tag_potential_proper_nouns = True if initial_answers['tag_potential_proper_nouns'] == "Yes" else False
+    columnar_sentences = True if initial_answers['columnar_sentences'] == "Yes" else False
+    windowed_tagging = True if initial_answers['windowed_tagging'] == "Yes" else False
+    hybrid = True if initial_answers['hybrid'] == "Yes" else False
     additional_questions = []
+    if initial_answers['tokenizer'] == "spacy":
+        additional_questions.append(
+            inquirer.List(
+                'spacy_model',
+                message="Select spaCy model",
+                choices=list(reversed(SPACY_MODELS))
+            )
+        )
+        additional_questions.append(
+            inquirer.Text(
+                'spacy_batch_size',
+                message="Number of lines spaCy processes together (blank for spaCy's default)",
+                validate=validate_optional_positive_int
+            )
+        )
+        additional_questions.append(
+            inquirer.Text(
+                'spacy_n_process',
+                message="Number of processes to tokenize with (blank for 1)",
+                validate=validate_optional_positive_int
+            )
+        )
     if use_user_dict:
         additional_questions.append(
             inquirer.Path(
@@ -214,6 +325,13 @@ def setup_nlp_mtl_preprocessor():
         use_user_dict=use_user_dict,
         user_dic_path=additional_answers.get('user_dict_path'),
         use_single_kanji_filter=use_single_kanji_filter,
+        spacy_model=additional_answers.get('spacy_model', DEFAULT_SPACY_MODEL),
+        columnar_sentences=columnar_sentences,
+        windowed_tagging=windowed_tagging,
+        hybrid=hybrid,
+        tokenization_chunk_size=parse_optional_int(initial_answers['tokenization_chunk_size']),
+        spacy_batch_size=parse_optional_int(additional_answers.get('spacy_batch_size')),
+        spacy_n_process=parse_optional_int(additional_answers.get('spacy_n_process')) or 1,
     )
     env_config.write_env()
 
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+# Incremented whenever the way replacement tables are compiled into
+# plans changes, so that stale cached plans are never loaded
+PLAN_VERSION = 1
+PLAN_CACHE_FOLDER = "replacement-plan-cache"
+
+class ReplacementOperation(NamedTuple):
+    # Index of the rule (in the preprocessor's rule list) that the
+    # operation belongs to
+    rule_index: int
+    pattern: str
+    replacement: str
+    # For name rules, the EN honorific that is being replaced, or "NA"
+    # when replacing the name by itself. None for non-name rules.
+    honorific: Optional[str] = None
+    # Single kanji names are only replaced when they have been tagged as
+    # proper nouns, and are skipped entirely by the single kanji filter
+    is_single_kanji: bool = False
+    # Name variant (ie. "菜月・昴") that the operation was generated from.
+    # Used to group the operations of a name when logging.
+    jp_name: Optional[str] = None
+    en_name: Optional[str] = None
+
+# Flat, ordered list of every replacement that a preprocessor will
+# attempt for a given replacement table. Compiling the table in advance
+# means name combinations, honorific patterns and previously replaced
+# names only need to be worked out once, rather than once per chapter.
+class ReplacementPlan:
+    def __init__(
+        self,
+        operations:Iterable[ReplacementOperation],
+        # Indexes of the rules whose json_key is present in the table
+        rule_indexes:Iterable[int],
+        table_hash:str,
+        version:int = PLAN_VERSION
+    ):
+        self.operations = list(operations)
+        self.rule_indexes = set(rule_indexes)
+        self.table_hash = table_hash
+        self.version = version
+        self._rule_operations = {rule_index: [] for rule_index in self.rule_indexes}
+        for operation in self.operations:
+            self._rule_operations[operation.rule_index].append(operation)
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ReplacementPlan):
+            return False
+        return self.operations == other.operations and \
+            self.rule_indexes == other.rule_indexes and \
+            self.table_hash == other.table_hash and \
+            self.version == other.version
+
+    def has_rule(self, rule_index:int) -> bool:
+        return rule_index in self.rule_indexes
+
+    def get_rule_operations(self, rule_index:int) -> List[ReplacementOperation]:
+        return self._rule_operations.get(rule_index, [])
+
+    # Key order is significant, as it determines replacement order, so
+    # the table is hashed without sorting its keys
+    @staticmethod
+    def hash_replacement_table(replacement_table) -> str:
+        table_json = json.dumps(replacement_table, ensure_ascii=False)
+        return hashlib.sha256(table_json.encode("utf-8")).hexdigest()
+
+    def save(self, filename:str):
+        plan_json = {
+            "version": self.version,
+            "table_hash": self.table_hash,
+            "rule_indexes": sorted(self.rule_indexes),
+            "operations": [list(operation) for operation in self.operations],
+        }
+        with open(filename, "w", encoding="utf-8") as plan_file:
+            plan_file.write(json.dumps(plan_json, ensure_ascii=False))
+
+    @classmethod
+    def load(cls, filename:str) -> "ReplacementPlan":
+        with open(filename, "r", encoding="utf-8") as plan_file:
+            plan_json = json.loads(plan_file.read())
+        return ReplacementPlan(
+            operations=[
+                ReplacementOperation(*operation) for operation in plan_json["operations"]
+            ],
+            rule_indexes=plan_json["rule_indexes"],
+            table_hash=plan_json["table_hash"],
+            version=plan_json["version"],
+        )
+
+    # Loads a previously compiled plan for the replacement table if one
+    # has been cached, and otherwise compiles and caches a new plan.
+    # plan_name distinguishes between plans compiled by different
+    # preprocessors from the same table.
+    @classmethod
+    def load_or_compile(
+        cls,
+        plan_name:str,
+        replacement_table,
+        compile_plan:Callable[[dict], "ReplacementPlan"],
+        cache_folder:str = PLAN_CACHE_FOLDER,
+    ) -> "ReplacementPlan":
+        table_hash = cls.hash_replacement_table(replacement_table)
+        cache_filename = f"{cache_folder}/{plan_name}-{table_hash}-v{PLAN_VERSION}.json"
+        if os.path.exists(cache_filename):
+            # A cached plan that can't be read (ie. the file was truncated
+            # by an interrupted save) is compiled again
+            try:
+                plan = cls.load(cache_filename)
+            except (OSError, ValueError, KeyError, TypeError):
+                plan = None
+            if plan is not None and \
+               plan.version == PLAN_VERSION and \
+               plan.table_hash == table_hash:
+                return plan
+        plan = compile_plan(replacement_table)
+        # Another run may create the folder at the same time
+        os.makedirs(cache_folder, exist_ok=True)
+        plan.save(cache_filename)
+        return plan
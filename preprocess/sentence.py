@@ -1,10 +1,36 @@
 from bisect import bisect_right
-from typing import Iterable, NamedTuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Tuple
+
+from preprocess.tokenizer.part_of_speech import PartOfSpeech
+
+# phrase_matcher imports Word from this module
+if TYPE_CHECKING:
+    from preprocess.phrase_matcher import PhraseMatcher
 
 class Word(NamedTuple):
     text:str
     part_of_speech:str
 
+# Part of speech -> word text -> Word
+_INTERNED_WORDS:Dict[str, Dict[str, Word]] = {}
+
+# Chapters repeat the same few thousand words over and over, so
+# tokenizers share one Word per (text, part of speech) pair for the
+# lifetime of the process rather than creating a new Word per token.
+# Enum parts of speech are stored as their string values, so that
+# Word("x", PartOfSpeech.NOUN) and Word("x", "名詞") are the same object.
+def intern_word(text:str, part_of_speech:str) -> Word:
+    if isinstance(part_of_speech, PartOfSpeech):
+        part_of_speech = part_of_speech.value
+    words_by_text = _INTERNED_WORDS.get(part_of_speech)
+    if words_by_text is None:
+        words_by_text = _INTERNED_WORDS.setdefault(part_of_speech, {})
+    word = words_by_text.get(text)
+    if word is None:
+        word = Word(text, part_of_speech)
+        words_by_text[text] = word
+    return word
+
 class Sentence:
     def __init__(self, words:Iterable[Word]):
         self.words = tuple(words)
@@ -22,24 +48,50 @@ class Sentence:
             return False
         return self.words == other.words
 
+    # Sentences created by replacements use the same representation as
+    # the sentence they were created from
+    def _new_sentence(self, words:Iterable[Word]) -> "Sentence":
+        return Sentence(words)
+
 
     # Replaces the text in a single tagged word with a new string
     def replace_word(self, old_word:Word, new_text:str) -> "Sentence":
+        new_sentence, _ = self.replace_word_and_count(old_word, new_text)
+        return new_sentence
+
+    # Equivalent to calling count_word and then replace_word, but only
+    # iterates over the words once. If the word does not appear in the
+    # sentence, the sentence itself is returned rather than a copy.
+    def replace_word_and_count(self, old_word:Word, new_text:str) -> Tuple["Sentence", int]:
+        match_count = 0
         word_list = []
         for word in self.words:
-            if word == old_word:
+            # Interned words can be compared by identity
+            if word is old_word or word == old_word:
                 word_list.append(old_word._replace(text=new_text))
+                match_count += 1
             else:
                 word_list.append(word)
-        return Sentence(word_list)    
+        if match_count == 0:
+            return self, 0
+        return self._new_sentence(word_list), match_count
 
     # If 1+ sequential whole words match a given string, it will replace 
     # the entire matching sequence with a single word containing the 
     # replacement string
     def replace_multi_word_sequence(self, old_text:str, new_word:Word) -> "Sentence":
+        new_sentence, _ = self.replace_and_count(old_text, new_word)
+        return new_sentence
+
+    # Equivalent to calling count and then replace_multi_word_sequence, but
+    # only searches the sentence once. If the string does not appear in the
+    # sentence as a sequence of whole words, the sentence itself is returned
+    # rather than a copy.
+    def replace_and_count(self, old_text:str, new_word:Word) -> Tuple["Sentence", int]:
         sentence_str = str(self)
         if old_text not in sentence_str:
-            return Sentence(self.words)
+            return self, 0
+        match_count = 0
         search_starting_index = 0
         all_matches_found = False
         word_list = []
@@ -62,7 +114,7 @@ class Sentence:
                 sequence_word_count = 0
                 current_sequence = ""
                 match_found = False
-                # Logic is essentially duplicated from Sentence.count
+                # See Sentence.count for how sequences of words are matched
                 while len(current_sequence) < len(old_text) and \
                     matching_word_index + sequence_word_count < len(self.words):
                     current_sequence_word = self.words[matching_word_index + sequence_word_count]
@@ -72,6 +124,7 @@ class Sentence:
                     elif current_sequence == old_text:
                         word_list.append(new_word)
                         match_found = True
+                        match_count += 1
                         search_starting_index = current_match_index + len(old_text)
                     sequence_word_count += 1
                 if not match_found:
@@ -82,8 +135,19 @@ class Sentence:
                         all_matches_found = True 
             if search_starting_index >= len(sentence_str):
                 all_matches_found = True   
-        new_sentence = Sentence(word_list)      
-        return new_sentence
+        if match_count == 0:
+            return self, 0
+        return self._new_sentence(word_list), match_count
+
+    # Replaces every phrase known to the phrase matcher that appears in the
+    # sentence as a sequence of whole words, in a single walk over the
+    # words where possible. Returns the new sentence along with the number
+    # of replacements made for each phrase.
+    def apply_phrases(self, phrase_matcher:"PhraseMatcher") -> Tuple["Sentence", List[int]]:
+        word_list, counts = phrase_matcher.apply(self.words)
+        if sum(counts) == 0:
+            return self, counts
+        return self._new_sentence(word_list), counts
 
     # Return the number of occurences of a given string, where each occurence
     # indicates that the string has appeared in the sentence as a sequence of 
@@ -135,7 +199,7 @@ class Sentence:
     def count_word(self, query_word:Word) -> int:
         match_count = 0
         for word in self.words:
-            if word == query_word:
+            if word is query_word or word == query_word:
                 match_count += 1
         return match_count
 
@@ -0,0 +1,334 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from preprocess.columnar_sentence import ColumnarSentence, ColumnarSentenceWriter
+from preprocess.phrase_matcher import PhraseMatcher
+from preprocess.sentence import Sentence, Word
+
+# Binary indexed tree over a list of non-negative integers, supporting
+# point updates and prefix sums in O(log n). The tree is kept in an 
+# array rather than a list, as it has an entry for every word.
+class _FenwickTree:
+    def __init__(self, values:Iterable[int]):
+        self._tree = array("I", [0])
+        self._tree.extend(values)
+        self._size = len(self._tree) - 1
+        # Build in O(n) by pushing each node's total to its parent
+        for i in range(1, self._size + 1):
+            parent = i + (i & -i)
+            if parent <= self._size:
+                self._tree[parent] += self._tree[i]
+
+    def add(self, index:int, delta:int):
+        i = index + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    # Sum of the values before index
+    def prefix_sum(self, index:int) -> int:
+        total = 0
+        i = index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    # Smallest index whose inclusive prefix sum is greater than target.
+    # Values must be non-negative.
+    def search(self, target:int) -> int:
+        index = 0
+        remaining = target
+        step = 1 << self._size.bit_length()
+        while step > 0:
+            next_index = index + step
+            if next_index <= self._size and self._tree[next_index] <= remaining:
+                index = next_index
+                remaining -= self._tree[next_index]
+            step >>= 1
+        return index
+
+# Slots of a SentenceBuilder over a ColumnarSentence. Words are read
+# from the columns of the sentence when accessed, and only the slots
+# that have been edited hold Words (or None if removed).
+class _ColumnarSlots:
+    def __init__(self, sentence:ColumnarSentence):
+        self._sentence = sentence
+        self._edited_slots:Dict[int, Optional[Word]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sentence._word_ending_indexes)
+
+    def __getitem__(self, slot_index:int) -> Optional[Word]:
+        if slot_index in self._edited_slots:
+            return self._edited_slots[slot_index]
+        return self._sentence.get_word(slot_index)
+
+    def __setitem__(self, slot_index:int, word:Optional[Word]):
+        self._edited_slots[slot_index] = word
+
+    # Text of the word in each slot, or None for removed slots
+    def iter_texts(self) -> Iterator[Optional[str]]:
+        text = self._sentence._str
+        edited_slots = self._edited_slots
+        word_starting_index = 0
+        for slot_index, word_ending_index in enumerate(self._sentence._word_ending_indexes):
+            if slot_index in edited_slots:
+                word = edited_slots[slot_index]
+                yield None if word is None else word.text
+            else:
+                yield text[word_starting_index:word_ending_index]
+            word_starting_index = word_ending_index
+
+    # Copies the columns of each run of slots between edits, rather
+    # than creating Words for them
+    def build(self) -> ColumnarSentence:
+        sentence_writer = ColumnarSentenceWriter()
+        previous_slot_index = 0
+        for slot_index in sorted(self._edited_slots):
+            sentence_writer.extend_from_sentence(self._sentence, previous_slot_index, slot_index)
+            word = self._edited_slots[slot_index]
+            if word is not None:
+                sentence_writer.append(word)
+            previous_slot_index = slot_index + 1
+        sentence_writer.extend_from_sentence(self._sentence, previous_slot_index, len(self))
+        return sentence_writer.build()
+
+# Maps word text, and the first character of word text, to the slots
+# of the words containing that text
+class _WordIndex:
+    def __init__(self, slot_texts:Iterable[Optional[str]]):
+        self._text_slots:Dict[str, Set[int]] = {}
+        self._first_char_slots:Dict[str, Set[int]] = {}
+        # Same as calling add for each word, without the call overhead
+        for i, text in enumerate(slot_texts):
+            if text is None:
+                continue
+            text_slots = self._text_slots.get(text)
+            if text_slots is None:
+                self._text_slots[text] = {i}
+            else:
+                text_slots.add(i)
+            if len(text) > 0:
+                first_char_slots = self._first_char_slots.get(text[0])
+                if first_char_slots is None:
+                    self._first_char_slots[text[0]] = {i}
+                else:
+                    first_char_slots.add(i)
+
+    def add(self, slot_index:int, word:Word):
+        self._text_slots.setdefault(word.text, set()).add(slot_index)
+        if len(word.text) > 0:
+            self._first_char_slots.setdefault(word.text[0], set()).add(slot_index)
+
+    def remove(self, slot_index:int, word:Word):
+        self._text_slots[word.text].discard(slot_index)
+        if len(word.text) > 0:
+            self._first_char_slots[word.text[0]].discard(slot_index)
+
+    def get_text_slots(self, text:str) -> Set[int]:
+        return self._text_slots.get(text, set())
+
+    def get_first_char_slots(self, first_chars:Iterable[str]) -> Set[int]:
+        slots = set()
+        for char in first_chars:
+            char_slots = self._first_char_slots.get(char)
+            if char_slots:
+                slots |= char_slots
+        return slots
+
+# Mutable view of a tagged sentence, for making many replacements
+# without rebuilding the whole Sentence after each one.
+#
+# Edits are recorded against slots that correspond to the words of the
+# original sentence. Replacing a sequence of words puts the new word in
+# the first slot of the sequence and marks the rest as removed (None),
+# so the cost of an edit only depends on the length of the sequence
+# being replaced. Character offsets and word positions are kept in
+# Fenwick trees over the slots, and the immutable Sentence and its
+# string are only rebuilt when asked for after an edit.
+#
+# When index_words is True, the slots of each word's text and first
+# character are also indexed and kept up to date with each edit, so
+# that lookups only need to check candidate words instead of every word
+# in the sentence. This is worth the cost of building the index when
+# many lookups are made against the same sentence.
+#
+# The slots of a ColumnarSentence are read from its columns, so that
+# Words are only kept for the slots that are edited.
+class SentenceBuilder:
+    def __init__(self, sentence:Sentence, index_words:Optional[bool] = False):
+        self._slots:Union[List[Optional[Word]], _ColumnarSlots]
+        if isinstance(sentence, ColumnarSentence):
+            self._slots = _ColumnarSlots(sentence)
+        else:
+            self._slots = list(sentence.words)
+        self._word_index:Optional[_WordIndex] = None
+        if index_words:
+            self._word_index = _WordIndex(self._iter_slot_texts())
+        self._text_lengths = _FenwickTree(len(text) for text in self._iter_slot_texts())
+        self._word_flags = _FenwickTree([1] * len(self._slots))
+        self._word_count = len(self._slots)
+        self._sentence:Optional[Sentence] = sentence
+        self._new_sentence = sentence._new_sentence
+        self._str:Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._word_count
+
+    def __str__(self) -> str:
+        if self._str is None:
+            if self._sentence is not None:
+                self._str = str(self._sentence)
+            else:
+                self._str = "".join([text for text in self._iter_slot_texts() if text is not None])
+        return self._str
+
+    def build(self) -> Sentence:
+        if self._sentence is None:
+            if isinstance(self._slots, _ColumnarSlots):
+                self._sentence = self._slots.build()
+            else:
+                self._sentence = self._new_sentence([word for word in self._slots if word is not None])
+        return self._sentence
+
+    def _iter_slot_texts(self) -> Iterator[Optional[str]]:
+        if isinstance(self._slots, _ColumnarSlots):
+            return self._slots.iter_texts()
+        return (None if word is None else word.text for word in self._slots)
+
+    # Replaces the text of every word equal to old_word and returns the
+    # number of words replaced
+    def replace_word_and_count(self, old_word:Word, new_text:str) -> int:
+        new_word = old_word._replace(text=new_text)
+        matching_slot_indexes = self._find_word(old_word)
+        for i in matching_slot_indexes:
+            self._replace_slots(i, i + 1, new_word)
+        return len(matching_slot_indexes)
+
+    # Same as calling replace_word_and_count for each (old_word, new_text)
+    # pair in order, but only checks each word once. Returns the number of
+    # words replaced for each pair.
+    #
+    # The new text must not be the text of any of the old words, as words
+    # are not checked again after being replaced.
+    def replace_words_and_count(self, replacements:List[Tuple[Word, str]]) -> List[int]:
+        counts = [0] * len(replacements)
+        # Word text -> (old_word, index of the replacement) for each
+        # replacement of a word with that text, in order
+        replacements_by_text:Dict[str, List[Tuple[Word, int]]] = {}
+        for i, (old_word, _) in enumerate(replacements):
+            replacements_by_text.setdefault(old_word.text, []).append((old_word, i))
+        if self._word_index is None:
+            candidate_slot_indexes = range(len(self._slots))
+        else:
+            candidate_slot_indexes = set()
+            for text in replacements_by_text:
+                candidate_slot_indexes |= self._word_index.get_text_slots(text)
+            candidate_slot_indexes = sorted(candidate_slot_indexes)
+        for slot_index in candidate_slot_indexes:
+            word = self._slots[slot_index]
+            if word is None:
+                continue
+            # Only the first replacement of a word can match it, as the
+            # word is no longer there for any later replacements
+            for old_word, i in replacements_by_text.get(word.text, ()):
+                if word is old_word or word == old_word:
+                    self._replace_slots(
+                        slot_index, 
+                        slot_index + 1, 
+                        old_word._replace(text=replacements[i][1])
+                    )
+                    counts[i] += 1
+                    break
+        return counts
+
+    # Replaces each sequence of whole words matching old_text with new_word
+    # and returns the number of sequences replaced.
+    #
+    # Single phrases are matched with a new PhraseMatcher rather than one
+    # from compile_phrases, so that one-off queries don't evict the 
+    # cached matchers of the replacement table.
+    def replace_and_count(self, old_text:str, new_word:Word) -> int:
+        phrase_matcher = PhraseMatcher(((old_text, new_word),))
+        return self.apply_phrases(phrase_matcher)[0]
+
+    # Same as Sentence.apply_phrases, returning the number of replacements
+    # made for each phrase
+    def apply_phrases(self, phrase_matcher:PhraseMatcher) -> List[int]:
+        counts = [0] * len(phrase_matcher)
+        for batch_index in range(phrase_matcher.batch_count):
+            replacements = phrase_matcher.find_batch_replacements(
+                batch_index,
+                self._slots,
+                counts,
+                self._get_phrase_starting_slots(phrase_matcher, batch_index)
+            )
+            for starting_index, ending_index, replacement_word in replacements:
+                self._replace_slots(starting_index, ending_index, replacement_word)
+        return counts
+
+    # Same as Sentence.count. As with replace_and_count, the matcher is 
+    # not cached.
+    def count(self, query:str) -> int:
+        phrase_matcher = PhraseMatcher(((query, Word(query, "")),))
+        counts = [0]
+        phrase_matcher.find_batch_replacements(
+            0,
+            self._slots,
+            counts,
+            self._get_phrase_starting_slots(phrase_matcher, 0)
+        )
+        return counts[0]
+
+    # Same as Sentence.count_word
+    def count_word(self, query_word:Word) -> int:
+        return len(self._find_word(query_word))
+
+    def _find_word(self, query_word:Word) -> List[int]:
+        if self._word_index is None:
+            candidate_slot_indexes = range(len(self._slots))
+        else:
+            candidate_slot_indexes = sorted(self._word_index.get_text_slots(query_word.text))
+        return [
+            i for i in candidate_slot_indexes 
+            if self._slots[i] is query_word or self._slots[i] == query_word
+        ]
+
+    # Slots of the words that could start one of the phrases in the batch,
+    # or None if every word must be checked
+    def _get_phrase_starting_slots(self, phrase_matcher:PhraseMatcher, batch_index:int) -> Optional[Set[int]]:
+        if self._word_index is None:
+            return None
+        return self._word_index.get_first_char_slots(
+            phrase_matcher.get_batch_first_chars(batch_index)
+        )
+
+    def get_word_index_from_char_index(self, char_index:int) -> int:
+        if char_index < 0:
+            raise IndexError(
+                f"Index must be greater than or equal to 0. Received negative index: {char_index}"
+            )
+        elif char_index >= self._text_lengths.prefix_sum(len(self._slots)):
+            raise IndexError(f"Index out of bounds: {char_index}")
+        slot_index = self._text_lengths.search(char_index)
+        return self._word_flags.prefix_sum(slot_index)
+
+    def _replace_slots(self, starting_index:int, ending_index:int, new_word:Word):
+        for i in range(starting_index, ending_index):
+            word = self._slots[i]
+            if word is None:
+                continue
+            self._text_lengths.add(i, -len(word.text))
+            if self._word_index is not None:
+                self._word_index.remove(i, word)
+            if i > starting_index:
+                self._word_flags.add(i, -1)
+                self._word_count -= 1
+                self._slots[i] = None
+        self._slots[starting_index] = new_word
+        self._text_lengths.add(starting_index, len(new_word.text))
+        if self._word_index is not None:
+            self._word_index.add(starting_index, new_word)
+        self._sentence = None
+        self._str = None
@@ -1,31 +1,69 @@
+from collections import OrderedDict
 from difflib import SequenceMatcher
 import re
-from typing import Optional, Iterable, List
+from typing import Callable, Container, Dict, NamedTuple, Optional, Iterable, List, Sequence, Tuple
 
+from preprocess.columnar_sentence import ColumnarSentenceWriter
 from preprocess.tokenizer.tokenizer import Tokenizer
 from preprocess.ner.basic_named_entity_recognizer import BasicNamedEntityRecognizer
-from preprocess.sentence import Sentence, Word
+from preprocess.sentence import Sentence, Word, intern_word
 from preprocess.tokenizer.part_of_speech import PartOfSpeech
-from preprocess.utils import sort_list_by_string_length
+from preprocess.utils import is_punctuation, sort_list_by_string_length
 
 
+class NameCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    max_size: Optional[int]
+    current_size: int
+
 class Tagger:
 
     # Arbitrary token used to replace punctuation which tokenizers 
     # handle poorly.
     PUNCTUATION_REPLACEMENT_TOKEN = "$$$"
 
+    # Part of speech of the words holding lines that were left untagged
+    UNTAGGED_PART_OF_SPEECH = "UNTAGGED"
+
     def __init__(
         self, 
         tokenizer:Tokenizer,
         # If True, will subdivide words that contain proper nouns, as
         # listed in proper_noun_list  
         tag_potential_proper_nouns:Optional[bool] = True, 
-        proper_noun_list:Optional[Iterable[str]] = None
+        proper_noun_list:Optional[Iterable[str]] = None,
+        # If True, tagged text is returned as a ColumnarSentence, which
+        # uses far less memory for long texts
+        columnar_sentences:Optional[bool] = False,
+        # Number of distinct words to remember the name recognition and
+        # proper noun subdivision results of. 0 disables the cache, and 
+        # None removes the limit.
+        name_cache_size:Optional[int] = 4096,
+        # If set, consecutive lines of up to this many characters in 
+        # total are tokenized together in a single call, and lines that
+        # are blank or only punctuation are not passed to the tokenizer.
+        # Chunks are made smaller where needed to stay within the 
+        # tokenizer's maximum input size. Otherwise each line is 
+        # tokenized on its own.
+        tokenization_chunk_size:Optional[int] = None
     ):
+        self._columnar_sentences = columnar_sentences
+        self._tokenization_chunk_size = tokenization_chunk_size
         self._name_recognizer = BasicNamedEntityRecognizer()
         self._tokenizer = tokenizer
         self._tag_potential_proper_nouns = tag_potential_proper_nouns
+        # Word text -> the words it is subdivided into if it is a
+        # potential name, otherwise None, from least to most recently used
+        self._name_cache:"OrderedDict[str, Optional[Tuple[Word, ...]]]" = OrderedDict()
+        self._name_cache_size = name_cache_size
+        self._name_cache_hits = 0
+        self._name_cache_misses = 0
+        self.set_proper_noun_list(proper_noun_list)
+
+    # Replaces the list of proper nouns that potential names are
+    # subdivided with, which also clears the name cache
+    def set_proper_noun_list(self, proper_noun_list:Optional[Iterable[str]]):
         self._proper_noun_list = []
         if proper_noun_list:
             # Sort list of additional taggable proper nouns from longest 
@@ -33,40 +71,220 @@ class Tagger:
             # substring
             for word in sort_list_by_string_length(proper_noun_list, reverse=True):
                 self._proper_noun_list.append(
-                    Word(word, PartOfSpeech.PROPER_NOUN)
+                    intern_word(word, PartOfSpeech.PROPER_NOUN)
                 )
+        self._proper_noun_trie = _WordListTrie(self._proper_noun_list)
+        self._name_cache.clear()
 
-    def tag(self, text:str) -> Sentence:
-        NEWLINE_WORD = Word(text='\n', part_of_speech=PartOfSpeech.WHITESPACE)
-        combined_word_list = []
-        for line in text.split("\n"):
-            tagged_sentence = self.tag_line(line)
-            combined_word_list += tagged_sentence.words
-            combined_word_list.append(NEWLINE_WORD)
-        combined_word_list.pop() # Remove final added NEWLINE_WORD
-        return Sentence(combined_word_list)
+    def name_cache_info(self) -> NameCacheInfo:
+        return NameCacheInfo(
+            self._name_cache_hits,
+            self._name_cache_misses,
+            self._name_cache_size,
+            len(self._name_cache)
+        )
+
+    # If tagged_line_indexes is provided, only the lines at those indexes
+    # are tagged, and every other non-empty line is kept as a single word
+    # with UNTAGGED_PART_OF_SPEECH
+    # columnar_sentences overrides the setting given to the constructor
+    # when it is not None
+    def tag(
+        self, 
+        text:str, 
+        tagged_line_indexes:Optional[Container[int]] = None,
+        columnar_sentences:Optional[bool] = None
+    ) -> Sentence:
+        if columnar_sentences is None:
+            columnar_sentences = self._columnar_sentences
+        NEWLINE_WORD = intern_word('\n', PartOfSpeech.WHITESPACE)
+        lines = text.split("\n")
+        # Tokenize every line to be tagged in a single call, so that 
+        # tokenizers can handle them together (see Tokenizer.tokenize_many)
+        preprocessed_lines = {
+            line_index: self._preprocess_text(line)
+            for line_index, line in enumerate(lines)
+            if tagged_line_indexes is None or line_index in tagged_line_indexes
+        }
+        if self._tokenization_chunk_size is None:
+            line_word_spans = dict(zip(
+                preprocessed_lines.keys(),
+                self._tokenizer.tokenize_spans_many(preprocessed_lines.values())
+            ))
+        else:
+            line_word_spans = self._tokenize_line_chunks(preprocessed_lines)
+        # Words are written straight into the columns of a ColumnarSentence
+        # when one is returned, so that they don't all have to be kept
+        if columnar_sentences:
+            combined_words = ColumnarSentenceWriter()
+        else:
+            combined_words = []
+        for line_index, line in enumerate(lines):
+            if line_index > 0:
+                combined_words.append(NEWLINE_WORD)
+            if line_index in line_word_spans:
+                tagged_sentence = self._tag_line_from_spans(
+                    line, 
+                    preprocessed_lines[line_index],
+                    line_word_spans[line_index]
+                )
+                combined_words.extend(tagged_sentence.words)
+            elif line_index in preprocessed_lines:
+                # Blank and punctuation only lines, when tokenizing in
+                # chunks (see _tokenize_line_chunks)
+                if len(line) > 0:
+                    combined_words.append(intern_word(line, PartOfSpeech.PUNCTUATION))
+            elif len(line) > 0:
+                combined_words.append(Word(line, Tagger.UNTAGGED_PART_OF_SPEECH))
+        if columnar_sentences:
+            return combined_words.build()
+        return Sentence(combined_words)
+
+    # Tokenizes the preprocessed lines by joining them into chunks of
+    # consecutive lines, separated by newlines, and splitting the words of
+    # each chunk back into lines at the newlines. Returns the word spans of
+    # each line by line index.
+    #
+    # Blank lines and lines that are only punctuation (ie. scene 
+    # separators) can never be part of a name, so they are left out, and
+    # are not included in the result. A line is tokenized again on its
+    # own if a word crosses its ends, which the tokenizer's results for
+    # the line on its own never would.
+    def _tokenize_line_chunks(self, preprocessed_lines:Dict[int, str]) -> Dict[int, List[Tuple[Word, int, int]]]:
+        # Chunks are also kept within the tokenizer's input limit, which is
+        # in bytes rather than characters (Japanese characters take 3
+        # bytes in UTF-8)
+        max_input_bytes = self._tokenizer.get_max_input_bytes()
+        # Line indexes of each chunk
+        chunks:List[List[int]] = []
+        chunk_length = 0
+        chunk_byte_length = 0
+        for line_index, preprocessed_line in preprocessed_lines.items():
+            if len(preprocessed_line) == 0 or is_punctuation(preprocessed_line):
+                continue
+            line_byte_length = len(preprocessed_line.encode("utf-8"))
+            if len(chunks) == 0 or \
+               chunk_length + len(preprocessed_line) > self._tokenization_chunk_size or \
+               (max_input_bytes is not None and chunk_byte_length + line_byte_length > max_input_bytes):
+                chunks.append([])
+                chunk_length = 0
+                chunk_byte_length = 0
+            chunks[-1].append(line_index)
+            chunk_length += len(preprocessed_line) + 1
+            chunk_byte_length += line_byte_length + 1
+        chunk_word_spans_list = self._tokenizer.tokenize_spans_many([
+            "\n".join([preprocessed_lines[line_index] for line_index in chunk])
+            for chunk in chunks
+        ])
+        line_word_spans = {}
+        # Lines that a word crossed the ends of
+        retokenized_line_indexes = []
+        for chunk, chunk_word_spans in zip(chunks, chunk_word_spans_list):
+            for line_index in chunk:
+                line_word_spans[line_index] = []
+            # Words are in order, so the lines are walked through along
+            # with them
+            chunk_position = 0
+            line_starting_index = 0
+            line_ending_index = len(preprocessed_lines[chunk[0]])
+            crossed_chunk_positions = set()
+            for word, word_starting_index, word_ending_index in chunk_word_spans:
+                while word_starting_index > line_ending_index:
+                    chunk_position += 1
+                    line_starting_index = line_ending_index + 1
+                    line_ending_index = line_starting_index + len(preprocessed_lines[chunk[chunk_position]])
+                if word_ending_index <= line_ending_index:
+                    line_word_spans[chunk[chunk_position]].append((
+                        word, 
+                        word_starting_index - line_starting_index, 
+                        word_ending_index - line_starting_index
+                    ))
+                elif word.text != "\n":
+                    # The word crosses the end of the line it starts in,
+                    # and the start of every line after that it ends in
+                    crossed_chunk_positions.add(chunk_position)
+                    next_line_starting_index = line_ending_index + 1
+                    for position in range(chunk_position + 1, len(chunk)):
+                        if next_line_starting_index >= word_ending_index:
+                            break
+                        crossed_chunk_positions.add(position)
+                        next_line_starting_index += len(preprocessed_lines[chunk[position]]) + 1
+            retokenized_line_indexes += [chunk[position] for position in sorted(crossed_chunk_positions)]
+        retokenized_word_spans_list = self._tokenizer.tokenize_spans_many([
+            preprocessed_lines[line_index] for line_index in retokenized_line_indexes
+        ])
+        for line_index, word_spans in zip(retokenized_line_indexes, retokenized_word_spans_list):
+            line_word_spans[line_index] = word_spans
+        return line_word_spans
 
     def tag_line(self, text:str) -> Sentence:
         preprocessed_text = self._preprocess_text(text)
-        word_list = self._tokenizer.tokenize(preprocessed_text)
-        if self._tag_potential_proper_nouns:
-            name_checked_word_list = []
-            for word in word_list:
-                if self._name_recognizer.is_name(word.text):
-                    tagged_subwords = self._tag_with_word_list(
-                        text=word.text, 
-                        word_list=self._proper_noun_list, 
-                        word_list_presorted=True
-                    )
-                    for subword in tagged_subwords:
-                        name_checked_word_list.append(subword)
-                else:
-                    name_checked_word_list.append(word)
-            word_list = name_checked_word_list
+        word_spans = self._tokenizer.tokenize_spans(preprocessed_text)
+        return self._tag_line_from_spans(text, preprocessed_text, word_spans)
+
+    # Tags a line from the spans of the words in its preprocessed text
+    def _tag_line_from_spans(
+        self, 
+        text:str, 
+        preprocessed_text:str, 
+        word_spans:List[Tuple[Word, int, int]]
+    ) -> Sentence:
+        word_list = []
+        # Whether the words cover the preprocessed text from start to end
+        # without any gaps, in which case the tagged text is known to match
+        # it and does not need to be compared against it. Spans are not
+        # enough on their own, as tokenizers may normalize the text of a
+        # word (ie. full width punctuation) while keeping its span.
+        words_cover_text = True
+        previous_ending_index = 0
+        for word, word_starting_index, word_ending_index in word_spans:
+            if word_starting_index != previous_ending_index or \
+               word_ending_index != word_starting_index + len(word.text) or \
+               not preprocessed_text.startswith(word.text, word_starting_index):
+                words_cover_text = False
+            previous_ending_index = word_ending_index
+            if self._tag_potential_proper_nouns:
+                tagged_subwords = self._get_name_subwords(word.text)
+            else:
+                tagged_subwords = None
+            if tagged_subwords is not None:
+                if "".join([subword.text for subword in tagged_subwords]) != word.text:
+                    words_cover_text = False
+                word_list += tagged_subwords
+            else:
+                word_list.append(word)
+        if previous_ending_index != len(preprocessed_text):
+            words_cover_text = False
+        if words_cover_text:
+            if text == preprocessed_text:
+                return Sentence(word_list)
+            restored_word_list = self._restore_placeholder_text(text, word_list)
+            if restored_word_list is not None:
+                return Sentence(restored_word_list)
         tagged_sentence = Sentence(word_list)
         validated_tagged_sentence = self._validate_tagging(text, tagged_sentence)
         return validated_tagged_sentence
 
+    # Returns the words that a potential name is subdivided into, or None
+    # if the text is not a potential name. Names recur throughout a text,
+    # so the results for the most recently seen words are cached.
+    def _get_name_subwords(self, text:str) -> Optional[Tuple[Word, ...]]:
+        if text in self._name_cache:
+            self._name_cache_hits += 1
+            self._name_cache.move_to_end(text)
+            return self._name_cache[text]
+        self._name_cache_misses += 1
+        if self._name_recognizer.is_name(text):
+            subwords = tuple(self._proper_noun_trie.segment(text, self._tokenizer.tokenize))
+        else:
+            subwords = None
+        if self._name_cache_size != 0:
+            self._name_cache[text] = subwords
+            if self._name_cache_size is not None and \
+               len(self._name_cache) > self._name_cache_size:
+                self._name_cache.popitem(last=False)
+        return subwords
+
 
     # Divide a string into words with preference given to a list of
     # provided words. Any unrecognized words should then be retokenized.
@@ -87,46 +305,128 @@ class Tagger:
             len_tagged_word_list = {(len(word), word) for word in word_list}
             for word_len, word in sorted(len_tagged_word_list, reverse=True):
                 sorted_word_list.append(word)
-        tagged_words = [] 
-        matching_word_found = False
-        for i, word in enumerate(sorted_word_list):
-            if word.text == text:
-                tagged_words.append(word)
-                matching_word_found = True
-                break
-            elif word.text in text:
-                unchecked_words = sorted_word_list[i+1:]
-                non_matching_text_parts = text.split(word.text)
-                for part in non_matching_text_parts:
-                    subword_list = self._tag_with_word_list(part, unchecked_words, True)
-                    for subword in subword_list:
-                        tagged_words.append(subword)
-                    tagged_words.append(word)
-                tagged_words.pop() # Last appended word is extra
-                matching_word_found = True
-                break
-        # Default to tokenizer once all the words in the provided
-        # word list have been tried
-        if not matching_word_found:
-            return self._tokenizer.tokenize(text)
-        else:
-            return tagged_words
+        return _WordListTrie(sorted_word_list).segment(text, self._tokenizer.tokenize)
 
     def _preprocess_text(self, text: str) -> str:
         # Tokenizers like Fugashi do not preserve whitespace, so replace 
         # with arbitrary punctuation token, and reintroduce the whitespace
         # after tagging.
-        text = re.sub(r'\s',  Tagger.PUNCTUATION_REPLACEMENT_TOKEN, text)
-        # Fugashi will treat words separated by '・' as one word, preventing
-        # partial name replacements (ie. replacing last name only, if a full 
-        # name replacement can't be made)
-        text = text.replace('・', Tagger.PUNCTUATION_REPLACEMENT_TOKEN)
-        return text
+        # Fugashi will also treat words separated by '・' as one word, 
+        # preventing partial name replacements (ie. replacing last name 
+        # only, if a full name replacement can't be made)
+        return _PLACEHOLDER_CHAR_PATTERN.sub(Tagger.PUNCTUATION_REPLACEMENT_TOKEN, text)
 
     def _validate_tagging(self, text: str, sentence: Sentence) -> Sentence:
         sentence_str = str(sentence)
         if text == sentence_str:
             return sentence
+        validated_sentence = self._validate_placeholder_tagging(text, sentence)
+        if validated_sentence is not None:
+            return validated_sentence
+        return self._validate_tagging_with_sequence_matcher(text, sentence)
+
+    # Linear time version of _validate_tagging_with_sequence_matcher for 
+    # the usual case, where the only differences between the original text 
+    # and the tagged text are the placeholders inserted by _preprocess_text.
+    # Returns None if the tagged text differs from the original in any 
+    # other way, or if a placeholder is part of a non-punctuation word.
+    def _validate_placeholder_tagging(self, text: str, sentence: Sentence) -> Optional[Sentence]:
+        if str(sentence) != self._preprocess_text(text):
+            return None
+        restored_word_list = self._restore_placeholder_text(text, sentence.words)
+        if restored_word_list is None:
+            return None
+        return Sentence(restored_word_list)
+
+    # Replaces the placeholders in words, which must make up the
+    # preprocessed version of text, with the original text. Each 
+    # whitespace character and '・' in the original text is replaced by
+    # PUNCTUATION_REPLACEMENT_TOKEN, so the two strings can be aligned by
+    # walking through them together rather than searching for matching 
+    # blocks. Produces the same words as _validate_tagging_with_sequence_matcher
+    # would, and returns None if a placeholder can't be told apart from 
+    # the original text or is part of a non-punctuation word.
+    def _restore_placeholder_text(self, text: str, words: Sequence[Word]) -> Optional[List[Word]]:
+        placeholder = Tagger.PUNCTUATION_REPLACEMENT_TOKEN
+        # Placeholders can only be told apart from the original text if
+        # none of their characters appear in it
+        if any(char in text for char in set(placeholder)):
+            return None
+        new_word_list = []
+        current_word_index = 0
+        # Index of the current word in the tagged text
+        current_word_starting_index = 0
+        # Index in the tagged text corresponding to the current index in
+        # the original text
+        tagged_index = 0
+        text_index = 0
+        while text_index < len(text):
+            is_placeholder_run = _is_placeholder_char(text[text_index])
+            run_ending_index = text_index + 1
+            while run_ending_index < len(text) and \
+                _is_placeholder_char(text[run_ending_index]) == is_placeholder_run:
+                run_ending_index += 1
+            if is_placeholder_run:
+                tagged_run_ending_index = tagged_index + \
+                    len(placeholder) * (run_ending_index - text_index)
+            else:
+                tagged_run_ending_index = tagged_index + (run_ending_index - text_index)
+            # Words (or the parts of words) that fall within the run
+            run_words = []
+            while current_word_index < len(words) and \
+                current_word_starting_index < tagged_run_ending_index:
+                word = words[current_word_index]
+                word_ending_index = current_word_starting_index + len(word.text)
+                part_starting_index = max(current_word_starting_index, tagged_index)
+                part_ending_index = min(word_ending_index, tagged_run_ending_index)
+                if part_starting_index == current_word_starting_index and \
+                   part_ending_index == word_ending_index:
+                    run_words.append(word)
+                else:
+                    # Only punctuation words can be split between runs
+                    if word.part_of_speech != PartOfSpeech.PUNCTUATION:
+                        return None
+                    run_words.append(Word(
+                        word.text[
+                            part_starting_index - current_word_starting_index:
+                            part_ending_index - current_word_starting_index
+                        ],
+                        word.part_of_speech
+                    ))
+                if word_ending_index > tagged_run_ending_index:
+                    break
+                current_word_index += 1
+                current_word_starting_index = word_ending_index
+            if is_placeholder_run:
+                # The sequence matcher version stops checking words once it
+                # reaches the end of the original text, so only the first
+                # word of a placeholder run at the end of the text is checked
+                if text_index > 0 and run_ending_index == len(text):
+                    checked_run_words = run_words[:1]
+                else:
+                    checked_run_words = run_words
+                if len(run_words) == 0 or any(
+                    run_word.part_of_speech != PartOfSpeech.PUNCTUATION 
+                    for run_word in checked_run_words
+                ):
+                    return None
+                # The placeholder words are replaced by a single word
+                # containing the original text. At the start of the text 
+                # that word takes the part of speech of the last of them,
+                # and otherwise the first.
+                if text_index == 0:
+                    part_of_speech = run_words[-1].part_of_speech
+                else:
+                    part_of_speech = run_words[0].part_of_speech
+                new_word_list.append(Word(text[text_index:run_ending_index], part_of_speech))
+            else:
+                new_word_list += run_words
+            text_index = run_ending_index
+            tagged_index = tagged_run_ending_index
+        return new_word_list
+
+    def _validate_tagging_with_sequence_matcher(self, text: str, sentence: Sentence) -> Sentence:
+        sentence_str = str(sentence)
         seq_match = SequenceMatcher(None, text, sentence_str, autojunk=False)
         matching_blocks = seq_match.get_matching_blocks()
         old_word_list = list(sentence.words)
@@ -289,4 +589,106 @@ class Tagger:
                 f"Original: {text}\n"
                 f"Tagged:   {validated_sentence}\n"
             )
-        return validated_sentence
\ No newline at end of file
+        return validated_sentence
+
+# Index of the trie node fields
+_CHILDREN = 0
+_WORD_INDEX = 1
+
+# Divides strings into words with preference given to an ordered list of
+# words, with the same result as searching the list for the first word
+# contained in the string, splitting the string on that word, and
+# recursing into each part with the words after it in the list. Parts
+# that don't contain any of the words are tokenized.
+#
+# The words are compiled into a character trie once, so that finding
+# every occurrence of every word in a string only takes a walk from each
+# character of the string, rather than a search of the string for each
+# word in the list. The parts of the string checked when recursing are
+# substrings of it, so the occurrences are found once and then filtered
+# by position for each part.
+class _WordListTrie:
+    def __init__(self, word_list:List[Word]):
+        self._word_list = list(word_list)
+        self._root = [{}, None]
+        for word_index, word in enumerate(self._word_list):
+            # Empty words can't be split on
+            if len(word.text) == 0:
+                continue
+            node = self._root
+            for char in word.text:
+                node = node[_CHILDREN].setdefault(char, [{}, None])
+            # Only the first of any duplicate words can match
+            if node[_WORD_INDEX] is None:
+                node[_WORD_INDEX] = word_index
+
+    def segment(self, text:str, tokenize:Callable[[str], List[Word]]) -> List[Word]:
+        if len(text) == 0:
+            return []
+        occurrences = self._find_occurrences(text)
+        if len(occurrences) == 0:
+            return tokenize(text)
+        return self._segment_part(text, 0, len(text), -1, occurrences, tokenize)
+
+    # Returns the (word index, starting index, ending index) of every
+    # occurrence of every word in text
+    def _find_occurrences(self, text:str) -> List[Tuple[int, int, int]]:
+        occurrences = []
+        root_children = self._root[_CHILDREN]
+        for i in range(len(text)):
+            node = root_children.get(text[i])
+            j = i + 1
+            while node is not None:
+                if node[_WORD_INDEX] is not None:
+                    occurrences.append((node[_WORD_INDEX], i, j))
+                if j == len(text):
+                    break
+                node = node[_CHILDREN].get(text[j])
+                j += 1
+        return occurrences
+
+    # Segments text[starting_index:ending_index] using only the words
+    # after previous_word_index in the list
+    def _segment_part(
+        self,
+        text:str,
+        starting_index:int,
+        ending_index:int,
+        previous_word_index:int,
+        occurrences:List[Tuple[int, int, int]],
+        tokenize:Callable[[str], List[Word]]
+    ) -> List[Word]:
+        if starting_index == ending_index:
+            return []
+        matching_word_index = None
+        for word_index, occurrence_starting_index, occurrence_ending_index in occurrences:
+            if word_index > previous_word_index and \
+               occurrence_starting_index >= starting_index and \
+               occurrence_ending_index <= ending_index and \
+               (matching_word_index is None or word_index < matching_word_index):
+                matching_word_index = word_index
+        if matching_word_index is None:
+            return tokenize(text[starting_index:ending_index])
+        matching_word = self._word_list[matching_word_index]
+        tagged_words = []
+        part_starting_index = starting_index
+        for part in text[starting_index:ending_index].split(matching_word.text):
+            part_ending_index = part_starting_index + len(part)
+            tagged_words += self._segment_part(
+                text,
+                part_starting_index,
+                part_ending_index,
+                matching_word_index,
+                occurrences,
+                tokenize
+            )
+            tagged_words.append(matching_word)
+            part_starting_index = part_ending_index + len(matching_word.text)
+        tagged_words.pop() # Last appended word is extra
+        return tagged_words
+
+# Characters that _preprocess_text replaces with the placeholder token
+_PLACEHOLDER_CHAR_PATTERN = re.compile(r'[\s・]')
+
+def _is_placeholder_char(char:str) -> bool:
+    return char.isspace() or char == '・'
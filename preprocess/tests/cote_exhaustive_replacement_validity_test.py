@@ -86,9 +86,12 @@ def build_nlp_preprocess_factory(
         replacement_table, 
         tokenizer, 
         tag_potential_proper_nouns=True,
-        single_kanji_filter=False
+        single_kanji_filter=False,
+        windowed_tagging=False,
+        hybrid=False
     ):
     name_list = NLP_MTL_Preprocess.generate_name_list_from_replacement_table(replacement_table)
+    replacement_plan = NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
     def factory(chapter_text):
         tagger = Tagger(
             tokenizer=tokenizer,
@@ -99,7 +102,10 @@ def build_nlp_preprocess_factory(
             text=chapter_text, 
             tagger=tagger, 
             replacement_table=replacement_table,
-            single_kanji_filter=single_kanji_filter
+            single_kanji_filter=single_kanji_filter,
+            replacement_plan=replacement_plan,
+            windowed_tagging=windowed_tagging,
+            hybrid=hybrid,
         )
     return factory
 
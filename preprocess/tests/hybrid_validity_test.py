@@ -0,0 +1,48 @@
+# Compare replacing unambiguous katakana names as plain strings (hybrid
+# mode) with replacing every name in the tagged text, for each corpus.
+# Differences are expected where the tokenizer splits a name differently
+# from the replacement table, so the results need to be reviewed rather
+# than only counted. The results for Re:Zero without the single kanji
+# filter are kept in benchmarks/rezero/sudachi-hybrid.diff.
+
+import glob
+import json
+
+from preprocess.tests.rezero_exhaustive_replacement_validity_test import (
+    build_nlp_preprocess_factory,
+    run_validity_test
+)
+from preprocess.tests.windowed_tagging_validity_test import CORPORA
+from preprocess.tokenizer.sudachi_tokenizer import SudachiTokenizer
+
+def main():
+    for docs_folder, replacement_table_filename, sudachi_user_dic_path in CORPORA:
+        fileset = sorted(glob.glob(f"{docs_folder}/*.txt"))
+        if len(fileset) == 0:
+            print(f"Skipping {docs_folder}, as it contains no chapter files")
+            continue
+        sudachi_tokenizer = SudachiTokenizer(user_dic_path=sudachi_user_dic_path)
+        with open(replacement_table_filename) as replacement_table_file:
+            replacement_table = json.loads(replacement_table_file.read())
+        for single_kanji_filter in [False, True]:
+            old_preprocess_factory = build_nlp_preprocess_factory(
+                replacement_table, 
+                sudachi_tokenizer,
+                single_kanji_filter=single_kanji_filter,
+            )
+            new_preprocess_factory = build_nlp_preprocess_factory(
+                replacement_table, 
+                sudachi_tokenizer,
+                single_kanji_filter=single_kanji_filter,
+                hybrid=True,
+            )
+            run_validity_test(
+                fileset=fileset,
+                old_preprocess_name="Sudachi MTL Preprocess",
+                old_preprocess_factory=old_preprocess_factory,
+                new_preprocess_name="Hybrid Sudachi MTL Preprocess",
+                new_preprocess_factory=new_preprocess_factory,
+            )
+
+if __name__ == "__main__":
+    main()
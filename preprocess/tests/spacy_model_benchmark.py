@@ -0,0 +1,83 @@
+# Report the load time and per line cost of each spaCy model, with and
+# without the components that don't affect parts of speech, along with
+# how many lines are tagged differently from the full default model, to
+# pick the cheapest setup that still matches its output
+
+import glob
+import time
+
+from preprocess.tagger import Tagger
+from preprocess.tokenizer.spacy_tokenizer import (
+    DEFAULT_SPACY_MODEL,
+    SPACY_MODELS,
+    SpacyTokenizer
+)
+
+DOCS_FOLDER = "preprocess/tests/docs/rezero"
+SAMPLE_CHAPTER_COUNT = 20
+
+def load_sample_chapters():
+    chapters = []
+    for filename in sorted(glob.glob(f"{DOCS_FOLDER}/*.txt"))[:SAMPLE_CHAPTER_COUNT]:
+        with open(filename) as chapter_file:
+            chapters.append(chapter_file.read())
+    return chapters
+
+def main():
+    chapters = load_sample_chapters()
+    line_count = sum([len(chapter.split("\n")) for chapter in chapters])
+    print(f"Tagging {line_count} lines from {DOCS_FOLDER}")
+    # The first configuration that is installed, ideally the full
+    # default model, is the reference that the others are compared against
+    configurations = [(DEFAULT_SPACY_MODEL, False)] + [
+        (model, exclude_unused_components)
+        for model in reversed(SPACY_MODELS)
+        for exclude_unused_components in [False, True]
+        if (model, exclude_unused_components) != (DEFAULT_SPACY_MODEL, False)
+    ]
+    reference_lines = None
+    for model, exclude_unused_components in configurations:
+        name = f"{model} ({'trimmed' if exclude_unused_components else 'full'})"
+        start_time = time.time()
+        try:
+            tokenizer = SpacyTokenizer(
+                model=model, 
+                exclude_unused_components=exclude_unused_components
+            )
+        except OSError:
+            print(f"{name}: not installed")
+            continue
+        load_time = time.time() - start_time
+        tagger = Tagger(tokenizer=tokenizer, tag_potential_proper_nouns=False)
+        start_time = time.time()
+        tagged_chapters = [tagger.tag(chapter) for chapter in chapters]
+        line_cost = (time.time() - start_time) / line_count
+        lines = [
+            line 
+            for tagged_chapter in tagged_chapters 
+            for line in _split_words_into_lines(tagged_chapter.words)
+        ]
+        if reference_lines is None:
+            print(f"Comparing against {name}")
+            reference_lines = lines
+        mismatched_line_count = sum([
+            1 for line, reference_line in zip(lines, reference_lines)
+            if line != reference_line
+        ])
+        print(
+            f"{name}: loaded in {load_time:.2f} seconds, "
+            f"{line_cost * 1000:.3f} ms per line, "
+            f"{mismatched_line_count} lines tagged differently"
+        )
+
+def _split_words_into_lines(words):
+    lines = [[]]
+    for word in words:
+        if word.text == "\n":
+            lines.append([])
+        else:
+            lines[-1].append(word)
+    return lines
+
+if __name__ == "__main__":
+    main()
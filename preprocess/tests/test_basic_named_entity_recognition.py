@@ -1,6 +1,11 @@
+import os
+import tempfile
 import unittest
 
-from preprocess.ner.basic_named_entity_recognizer import BasicNamedEntityRecognizer
+from preprocess.ner.basic_named_entity_recognizer import (
+    BasicNamedEntityRecognizer,
+    load_katakana_words
+)
 
 class TestBasicNamedEntityRecognizer(unittest.TestCase):    
     def test_is_name_false_for_kanji_word(self):
@@ -21,5 +26,19 @@ class TestBasicNamedEntityRecognizer(unittest.TestCase):
         actual = name_recognizer.is_name(sample_text)
         self.assertFalse(actual)
 
+    def test_katakana_words_shared_between_recognizers(self):
+        name_recognizer = BasicNamedEntityRecognizer()
+        other_name_recognizer = BasicNamedEntityRecognizer()
+        self.assertIs(name_recognizer._katakana_words, other_name_recognizer._katakana_words)
+        self.assertIs(name_recognizer._katakana_words, load_katakana_words())
+
+    def test_load_katakana_words_error_non_katakana_word(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "katakana_words.txt")
+            with open(filename, "w") as outfile:
+                outfile.write("イライラ\n犬\n")
+            with self.assertRaises(ValueError):
+                load_katakana_words(filename)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
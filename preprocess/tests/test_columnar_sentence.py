@@ -0,0 +1,93 @@
+import unittest
+
+from preprocess.columnar_sentence import ColumnarSentence
+from preprocess.phrase_matcher import PhraseMatcher
+from preprocess.sentence import Sentence, Word
+from preprocess.tokenizer.part_of_speech import PartOfSpeech
+
+class ColumnarSentenceTestCase(unittest.TestCase):
+    def test_from_words_equals_sentence(self):
+        words = generate_words()
+        columnar_sentence = ColumnarSentence.from_words(words)
+        self.assertEqual(columnar_sentence, Sentence(words))
+        self.assertEqual(Sentence(words), columnar_sentence)
+        self.assertEqual(columnar_sentence.words, tuple(words))
+        self.assertEqual(str(columnar_sentence), "スバルくんとスバル。")
+
+    def test_get_word(self):
+        columnar_sentence = ColumnarSentence.from_words(generate_words())
+        expected = Word(text='くん', part_of_speech='接尾辞')
+        actual = columnar_sentence.get_word(1)
+        self.assertEqual(actual, expected)
+
+    def test_part_of_speech_enum_matches_string(self):
+        columnar_sentence = ColumnarSentence.from_words(generate_words())
+        expected = 2
+        actual = columnar_sentence.count_word(Word('スバル', PartOfSpeech.PROPER_NOUN))
+        self.assertEqual(actual, expected)
+
+    def test_replace_and_count_multi_word(self):
+        words = generate_words()
+        columnar_sentence = ColumnarSentence.from_words(words)
+        new_word = Word(text='Subaru-kun', part_of_speech='NA')
+        expected = Sentence(words).replace_and_count("スバルくん", new_word)
+        actual = columnar_sentence.replace_and_count("スバルくん", new_word)
+        self.assertEqual(actual, expected)
+        self.assertIsInstance(actual[0], ColumnarSentence)
+
+    def test_replace_and_count_partial_word_no_occurence(self):
+        columnar_sentence = ColumnarSentence.from_words(generate_words())
+        actual_sentence, actual_count = columnar_sentence.replace_and_count(
+            "バルく", 
+            Word(text='x', part_of_speech='NA')
+        )
+        self.assertIs(actual_sentence, columnar_sentence)
+        self.assertEqual(actual_count, 0)
+
+    def test_replace_word_and_count(self):
+        words = generate_words()
+        columnar_sentence = ColumnarSentence.from_words(words)
+        old_word = Word(text='スバル', part_of_speech='固有名詞')
+        expected = Sentence(words).replace_word_and_count(old_word, "Subaru")
+        actual = columnar_sentence.replace_word_and_count(old_word, "Subaru")
+        self.assertEqual(actual, expected)
+        self.assertEqual(str(actual[0]), "SubaruくんとSubaru。")
+
+    def test_apply_phrases(self):
+        words = generate_words()
+        phrase_matcher = PhraseMatcher([
+            ("スバルくん", Word(text='Subaru-kun', part_of_speech='NA')),
+            ("スバル", Word(text='Subaru', part_of_speech='NA')),
+        ])
+        expected = Sentence(words).apply_phrases(phrase_matcher)
+        actual = ColumnarSentence.from_words(words).apply_phrases(phrase_matcher)
+        self.assertEqual(actual, expected)
+        self.assertIsInstance(actual[0], ColumnarSentence)
+
+    def test_get_word_index_from_char_index(self):
+        words = generate_words()
+        sentence = Sentence(words)
+        columnar_sentence = ColumnarSentence.from_words(words)
+        for char_index in range(len(str(sentence))):
+            with self.subTest(char_index=char_index):
+                self.assertEqual(
+                    columnar_sentence.get_word_index_from_char_index(char_index),
+                    sentence.get_word_index_from_char_index(char_index)
+                )
+
+    def test_get_word_index_from_char_index_error_out_of_bounds(self):
+        columnar_sentence = ColumnarSentence.from_words(generate_words())
+        with self.assertRaises(IndexError):
+            columnar_sentence.get_word_index_from_char_index(10)
+
+def generate_words():
+    return [
+        Word(text='スバル', part_of_speech='固有名詞'),
+        Word(text='くん', part_of_speech='接尾辞'),
+        Word(text='と', part_of_speech='助詞'),
+        Word(text='スバル', part_of_speech='固有名詞'),
+        Word(text='。', part_of_speech='補助記号'),
+    ]
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import unittest
+
+from preprocess.mtl_preprocess import MTL_Preprocess, Character, Names
+
+class MTL_PreprocessTestCase(unittest.TestCase):
+    def test_replace_names_matches_replace_name(self):
+        replacement_table = {
+            "names": {
+                "Natsuki Subaru": ["菜月", "昴"],
+                "Emilia": "エミリア",
+            },
+            "single-names": {
+                "Subaru": "スバル",
+                "Natsuki": "菜月",
+                "Kei": "恵",
+            },
+            "honorifics": {
+                "さん": "san",
+                "くん": "kun",
+                "さま": "sama",
+                "様": "sama",
+            }
+        }
+        rules = [
+            ('Imp Names', 'names', True, Names.ALL_NAMES, Names.ALL_NAMES),
+            ('Single Names', 'single-names', True, Names.LAST_NAME, Names.LAST_NAME),
+        ]
+        text = "菜月・昴くんと菜月さん、エミリア様とスバル。恵さま、恵。昴"
+        for single_kanji_filter in [True, False]:
+            expected_preprocess = MTL_Preprocess(
+                text, replacement_table, single_kanji_filter=single_kanji_filter
+            )
+            expected_replaced_names = dict()
+            for rule in rules:
+                for k, v in replacement_table[rule[1]].items():
+                    if not isinstance(v, list):
+                        v = [v]
+                    expected_preprocess.replace_name(
+                        Character(" ".join(v), k), rule[3], rule[4], expected_replaced_names
+                    )
+            actual_preprocess = MTL_Preprocess(
+                text, replacement_table, single_kanji_filter=single_kanji_filter
+            )
+            actual_replaced_names = dict()
+            rule_results = actual_preprocess.replace_names(rules, actual_replaced_names)
+            with self.subTest(single_kanji_filter=single_kanji_filter):
+                self.assertEqual(actual_preprocess.text, expected_preprocess.text)
+                self.assertEqual(actual_replaced_names, expected_replaced_names)
+                self.assertEqual(
+                    sum(rule_result[0] for rule_result in rule_results), 
+                    expected_preprocess.total_replacements
+                )
+
+    def test_replace_skips_names_without_honorifics(self):
+        replacement_table = {
+            "basic": {
+                "『": "«",
+            },
+            "names": {
+                "Emilia": "エミリア",
+            },
+        }
+        preprocess = MTL_Preprocess("『エミリア", replacement_table)
+        with contextlib.redirect_stdout(io.StringIO()):
+            actual = preprocess.replace()
+        self.assertEqual(actual, "«エミリア")
+
+if __name__ == "__main__":
+    unittest.main()
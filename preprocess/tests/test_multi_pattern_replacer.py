@@ -0,0 +1,71 @@
+import unittest
+
+from preprocess.multi_pattern_replacer import MultiPatternReplacer
+
+class MultiPatternReplacerTestCase(unittest.TestCase):
+    def test_replace_no_occurence(self):
+        replacer = MultiPatternReplacer([("魔女", "Witch")])
+        expected = ("あいうえお", [0])
+        actual = replacer.replace("あいうえお")
+        self.assertEqual(actual, expected)
+
+    def test_replace_multiple_keys_single_batch(self):
+        replacer = MultiPatternReplacer([("『", "«"), ("』", "»"), ("―", "-")])
+        expected = ("«あ»--«い»", [2, 2, 2])
+        actual = replacer.replace("『あ』――『い』")
+        self.assertEqual(actual, expected)
+        self.assertEqual(replacer.batch_count, 1)
+
+    def test_replace_earlier_key_shadows_later_containing_key(self):
+        replacements = [("賢人", "Sage"), ("大賢人", "Great Sage")]
+        replacer = MultiPatternReplacer(replacements)
+        expected = (sequential_replace("大賢人と賢人", replacements), [2, 0])
+        actual = replacer.replace("大賢人と賢人")
+        self.assertEqual(actual, expected)
+
+    def test_replace_earlier_key_is_prefix_of_later_key(self):
+        replacements = [("魔女", "Witch"), ("魔女の祠", "Witch's Shrine")]
+        replacer = MultiPatternReplacer(replacements)
+        expected = (sequential_replace("魔女の祠", replacements), [1, 0])
+        actual = replacer.replace("魔女の祠")
+        self.assertEqual(actual, expected)
+        self.assertEqual(replacer.batch_count, 1)
+
+    def test_replace_later_key_matches_earlier_replacement(self):
+        replacements = [("ちょんと", "ちゃんと"), ("ちゃんと", "properly")]
+        replacer = MultiPatternReplacer(replacements)
+        expected = (sequential_replace("ちょんと", replacements), [1, 1])
+        actual = replacer.replace("ちょんと")
+        self.assertEqual(actual, expected)
+
+    def test_replace_later_key_matches_across_removed_text(self):
+        replacements = [("x", ""), ("ab", "c")]
+        replacer = MultiPatternReplacer(replacements)
+        expected = ("c", [1, 1])
+        actual = replacer.replace("axb")
+        self.assertEqual(actual, expected)
+
+    def test_replace_matches_sequential_replacement(self):
+        replacements = [
+            ("ab", "b"), ("ba", "x"), ("a", "ba"), ("bb", "a"), ("abb", "")
+        ]
+        for text in ["", "a", "ab", "aabba", "babab", "abbabbaab"]:
+            expected_text = sequential_replace(text, replacements)
+            actual_text, _ = MultiPatternReplacer(replacements).replace(text)
+            with self.subTest(text=text):
+                self.assertEqual(actual_text, expected_text)
+
+    def test_replace_duplicate_key(self):
+        replacements = [("ア", "イ"), ("ウ", "エ"), ("ア", "オ")]
+        replacer = MultiPatternReplacer(replacements)
+        expected = (sequential_replace("アウ", replacements), [1, 1, 0])
+        actual = replacer.replace("アウ")
+        self.assertEqual(actual, expected)
+
+def sequential_replace(text, replacements):
+    for old, new in replacements:
+        text = text.replace(old, new)
+    return text
+
+if __name__ == "__main__":
+    unittest.main()
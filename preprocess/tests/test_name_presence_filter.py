@@ -0,0 +1,42 @@
+import unittest
+
+from preprocess.name_presence_filter import NamePresenceFilter
+from preprocess.replacement_plan import ReplacementOperation
+
+class NamePresenceFilterTestCase(unittest.TestCase):
+    def test_filter_skips_absent_names(self):
+        operations = [
+            ReplacementOperation(4, "スバルくん", "Subaru-kun", "kun", False, "スバル", "Subaru"),
+            ReplacementOperation(4, "スバル", "Subaru", "NA", False, "スバル", "Subaru"),
+            ReplacementOperation(4, "エミリアさん", "Emilia-san", "san", False, "エミリア", "Emilia"),
+            ReplacementOperation(4, "エミリア", "Emilia", "NA", False, "エミリア", "Emilia"),
+        ]
+        name_presence_filter = NamePresenceFilter("スバルとレム。")
+        expected = [1]
+        actual = name_presence_filter.filter(operations)
+        self.assertEqual(actual, expected)
+
+    def test_filter_keeps_pattern_containing_earlier_replacement(self):
+        operations = [
+            ReplacementOperation(4, "アル", "Al", "NA", False, "アル", "Al"),
+            ReplacementOperation(5, "Alさん", "Al-san", "san", False, "Al", "Al"),
+            ReplacementOperation(5, "Bobさん", "Bob-san", "san", False, "Bob", "Bob"),
+        ]
+        name_presence_filter = NamePresenceFilter("アルさん")
+        expected = [0, 1]
+        actual = name_presence_filter.filter(operations)
+        self.assertEqual(actual, expected)
+
+    def test_filter_ignores_replacements_of_skipped_operations(self):
+        name_presence_filter = NamePresenceFilter("Alさん")
+        name_presence_filter.filter([
+            ReplacementOperation(4, "アル", "Al", "NA", False, "アル", "Al"),
+        ])
+        expected = [0]
+        actual = name_presence_filter.filter([
+            ReplacementOperation(5, "Alさん", "Al-san", "san", False, "Al", "Al"),
+        ])
+        self.assertEqual(actual, expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+
+from preprocess.columnar_sentence import ColumnarSentence
+from preprocess.nlp_mtl_preprocess import NLP_MTL_Preprocess
+from preprocess.replacement_plan import ReplacementOperation
+from preprocess.sentence import Sentence, Word
+from preprocess.tagger import Tagger
+from preprocess.tokenizer.fugashi_tokenizer import FugashiTokenizer
+
+class NLP_MTL_PreprocessTestCase(unittest.TestCase):
+    def test_text_reflects_tokenized_replacements(self):
+        preprocess = generate_preprocess()
+        preprocess.replace_tokenized_phrase("スバルくん", "Subaru-kun")
+        preprocess.replace_tokenized_single_word(
+            Word(text='スバル', part_of_speech='固有名詞'), 
+            "Subaru"
+        )
+        self.assertEqual(preprocess.text, "Subaru-kunとSubaru。")
+        self.assertEqual(preprocess.total_replacements, 2)
+
+    def test_text_not_rebuilt_without_replacements(self):
+        preprocess = generate_preprocess()
+        preprocess.replace_tokenized_phrase("エミリア", "Emilia")
+        self.assertFalse(preprocess._text_is_dirty)
+        self.assertEqual(preprocess.text, "スバルくんとスバル。")
+
+    def test_setting_text_discards_pending_tokenized_text(self):
+        preprocess = generate_preprocess()
+        preprocess.replace_tokenized_phrase("スバルくん", "Subaru-kun")
+        preprocess.text = "エミリア"
+        self.assertEqual(preprocess.text, "エミリア")
+
+    def test_replace_name_operations_single_kanji_applied_in_order(self):
+        preprocess = generate_preprocess(single_kanji_filter=False)
+        operations = [
+            ReplacementOperation(0, "スバル", "Subaru", "NA", True, "スバル", "Subaru"),
+            ReplacementOperation(0, "Subaruくん", "Subaru-kun", "NA", False, "Subaruくん", "Subaru-kun"),
+            ReplacementOperation(0, "と", "and", "NA", False, "と", "and"),
+            ReplacementOperation(0, "スバル", "Natsuki", "NA", True, "スバル", "Natsuki"),
+        ]
+        expected = [2, 1, 1, 0]
+        actual = preprocess.replace_name_operations(operations)
+        self.assertEqual(actual, expected)
+        self.assertEqual(preprocess.text, "Subaru-kunandSubaru。")
+
+    def test_replace_name_operations_single_kanji_filter(self):
+        preprocess = generate_preprocess(single_kanji_filter=True)
+        operations = [
+            ReplacementOperation(0, "スバル", "Subaru", "NA", True, "スバル", "Subaru"),
+            ReplacementOperation(0, "スバルくん", "Subaru-kun", "NA", False, "スバルくん", "Subaru-kun"),
+        ]
+        expected = [None, 1]
+        actual = preprocess.replace_name_operations(operations)
+        self.assertEqual(actual, expected)
+        self.assertEqual(preprocess.text, "Subaru-kunとスバル。")
+
+    def test_replace_skips_tagging_without_names(self):
+        replacement_table = {
+            "names": {
+                "Emilia": "エミリア"
+            },
+            "honorifics": {
+                "さん": "san"
+            }
+        }
+        # Tagging would fail without a tagger
+        preprocess = NLP_MTL_Preprocess(
+            "スバルくんとスバル。", 
+            tagger=None, 
+            replacement_table=replacement_table
+        )
+        actual = preprocess.replace()
+        self.assertEqual(actual, "スバルくんとスバル。")
+        self.assertIsNone(preprocess.tagged_text)
+        self.assertEqual(preprocess.total_skipped_operations, 2)
+
+    def test_replace_windowed_tagging_matches_full_tagging(self):
+        text = "「エミリアさん」\n\nスバルは話した。\n「レム」"
+        replacement_table = {
+            "names": {
+                "Emilia": "エミリア",
+                "Rem": "レム",
+            },
+            "honorifics": {
+                "さん": "san"
+            }
+        }
+        tokenizer = FugashiTokenizer()
+        expected = NLP_MTL_Preprocess(
+            text, 
+            tagger=Tagger(tokenizer), 
+            replacement_table=replacement_table
+        ).replace()
+        preprocess = NLP_MTL_Preprocess(
+            text, 
+            tagger=Tagger(tokenizer), 
+            replacement_table=replacement_table,
+            windowed_tagging=True
+        )
+        actual = preprocess.replace()
+        self.assertEqual(actual, expected)
+        self.assertIn(
+            Word("スバルは話した。", Tagger.UNTAGGED_PART_OF_SPEECH), 
+            preprocess.tagged_text.words
+        )
+
+    def test_replace_columnar_sentences_matches_sentences(self):
+        text = "「エミリアさん」\n\nスバルくんは話した。\n「レム」"
+        replacement_table = {
+            "names": {
+                "Emilia": "エミリア",
+                "Subaru": "スバル",
+                "Rem": "レム",
+            },
+            "honorifics": {
+                "さん": "san",
+                "くん": "kun"
+            }
+        }
+        tokenizer = FugashiTokenizer()
+        expected = NLP_MTL_Preprocess(
+            text, 
+            tagger=Tagger(tokenizer), 
+            replacement_table=replacement_table
+        ).replace()
+        preprocess = NLP_MTL_Preprocess(
+            text, 
+            tagger=Tagger(tokenizer), 
+            replacement_table=replacement_table,
+            columnar_sentences=True
+        )
+        actual = preprocess.replace()
+        self.assertEqual(actual, expected)
+        self.assertIsInstance(preprocess.tagged_text, ColumnarSentence)
+
+    def test_replace_hybrid_replaces_katakana_names_without_tagging(self):
+        replacement_table = {
+            "names": {
+                "Emilia": "エミリア"
+            },
+            "honorifics": {
+                "さん": "san"
+            }
+        }
+        # Tagging would fail without a tagger
+        preprocess = NLP_MTL_Preprocess(
+            "「エミリアさん」とエミリア。", 
+            tagger=None, 
+            replacement_table=replacement_table,
+            hybrid=True
+        )
+        actual = preprocess.replace()
+        self.assertEqual(actual, "「Emilia-san」とEmilia。")
+        self.assertIsNone(preprocess.tagged_text)
+        self.assertEqual(preprocess.total_replacements, 2)
+        self.assertEqual(preprocess.total_string_operations, 2)
+        self.assertEqual(preprocess.total_tokenized_operations, 0)
+
+    def test_replace_hybrid_tags_names_next_to_katakana(self):
+        text = "エミリアとアルデバランとアルデバランズ。"
+        replacement_table = {
+            "names": {
+                "Emilia": "エミリア",
+                "Aldebaran": "アルデバラン"
+            }
+        }
+        tokenizer = FugashiTokenizer()
+        expected = NLP_MTL_Preprocess(
+            text, 
+            tagger=Tagger(tokenizer), 
+            replacement_table=replacement_table
+        ).replace()
+        preprocess = NLP_MTL_Preprocess(
+            text, 
+            tagger=Tagger(tokenizer), 
+            replacement_table=replacement_table,
+            hybrid=True
+        )
+        actual = preprocess.replace()
+        self.assertEqual(actual, expected)
+        self.assertEqual(preprocess.total_string_operations, 1)
+        self.assertEqual(preprocess.total_tokenized_operations, 1)
+
+def generate_preprocess(single_kanji_filter=True):
+    text = "スバルくんとスバル。"
+    preprocess = NLP_MTL_Preprocess(
+        text, 
+        tagger=None, 
+        single_kanji_filter=single_kanji_filter
+    )
+    preprocess.tagged_text = Sentence([
+        Word(text='スバル', part_of_speech='固有名詞'),
+        Word(text='くん', part_of_speech='接尾辞'),
+        Word(text='と', part_of_speech='助詞'),
+        Word(text='スバル', part_of_speech='固有名詞'),
+        Word(text='。', part_of_speech='補助記号'),
+    ])
+    return preprocess
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from preprocess.tokenizer.part_of_speech import (
+    PartOfSpeech,
+    get_part_of_speech_code,
+    get_part_of_speech_from_code
+)
+
+class PartOfSpeechTestCase(unittest.TestCase):
+    def test_code_matches_tag_code(self):
+        expected = get_part_of_speech_code("固有名詞")
+        actual = PartOfSpeech.PROPER_NOUN.code
+        self.assertEqual(actual, expected)
+
+    def test_from_code_member(self):
+        expected = PartOfSpeech.PUNCTUATION
+        actual = PartOfSpeech.from_code(PartOfSpeech.PUNCTUATION.code)
+        self.assertIs(actual, expected)
+
+    def test_from_code_unlisted_tag(self):
+        code = get_part_of_speech_code("助詞")
+        expected = "助詞"
+        actual = PartOfSpeech.from_code(code)
+        self.assertEqual(actual, expected)
+        self.assertEqual(get_part_of_speech_from_code(code), expected)
+
+    def test_codes_are_unique(self):
+        tags = ["助詞", "動詞", "名詞", "空白"]
+        codes = [get_part_of_speech_code(tag) for tag in tags]
+        self.assertEqual(len(set(codes)), len(tags))
+
+if __name__ == "__main__":
+    unittest.main()
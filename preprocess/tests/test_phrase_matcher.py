@@ -0,0 +1,88 @@
+import unittest
+
+from preprocess.phrase_matcher import PhraseMatcher
+from preprocess.sentence import Sentence, Word
+
+class PhraseMatcherTestCase(unittest.TestCase):
+    def test_apply_single_phrase_multi_word(self):
+        words = [
+            Word(text='スバル', part_of_speech='固有名詞'),
+            Word(text='くん', part_of_speech='接尾辞'),
+            Word(text='は', part_of_speech='助詞'),
+        ]
+        phrase_matcher = PhraseMatcher([
+            ("スバルくん", Word(text='Subaru-kun', part_of_speech='NA'))
+        ])
+        expected = (
+            [Word(text='Subaru-kun', part_of_speech='NA'), Word(text='は', part_of_speech='助詞')],
+            [1]
+        )
+        actual = phrase_matcher.apply(words)
+        self.assertEqual(actual, expected)
+
+    def test_apply_skips_partial_word_match(self):
+        words = [
+            Word(text='リアル', part_of_speech='名詞'),
+            Word(text='感', part_of_speech='接尾辞'),
+        ]
+        phrase_matcher = PhraseMatcher([
+            ("アル", Word(text='Al', part_of_speech='NA'))
+        ])
+        expected = (words, [0])
+        actual = phrase_matcher.apply(words)
+        self.assertEqual(actual, expected)
+
+    def test_apply_earlier_phrase_takes_precedence(self):
+        words = [
+            Word(text='スバル', part_of_speech='固有名詞'),
+            Word(text='くん', part_of_speech='接尾辞'),
+            Word(text='と', part_of_speech='助詞'),
+            Word(text='スバル', part_of_speech='固有名詞'),
+        ]
+        phrase_matcher = PhraseMatcher([
+            ("スバルくん", Word(text='Subaru-kun', part_of_speech='NA')),
+            ("スバル", Word(text='Subaru', part_of_speech='NA')),
+        ])
+        expected = (
+            [
+                Word(text='Subaru-kun', part_of_speech='NA'),
+                Word(text='と', part_of_speech='助詞'),
+                Word(text='Subaru', part_of_speech='NA'),
+            ],
+            [1, 1]
+        )
+        actual = phrase_matcher.apply(words)
+        self.assertEqual(actual, expected)
+
+    def test_apply_earlier_phrase_takes_precedence_over_earlier_position(self):
+        words = [Word(text='A', part_of_speech='NA'), Word(text='B', part_of_speech='NA'), Word(text='C', part_of_speech='NA')]
+        phrases = [
+            ("BC", Word(text='x', part_of_speech='NA')),
+            ("AB", Word(text='y', part_of_speech='NA')),
+        ]
+        expected = sequential_apply(words, phrases)
+        actual = PhraseMatcher(phrases).apply(words)
+        self.assertEqual(actual, expected)
+
+    def test_apply_phrase_containing_earlier_replacement(self):
+        words = [Word(text='A', part_of_speech='NA'), Word(text='B', part_of_speech='NA')]
+        phrases = [
+            ("A", Word(text='C', part_of_speech='NA')),
+            ("CB", Word(text='D', part_of_speech='NA')),
+        ]
+        phrase_matcher = PhraseMatcher(phrases)
+        expected = sequential_apply(words, phrases)
+        actual = phrase_matcher.apply(words)
+        self.assertEqual(actual, expected)
+        self.assertEqual(phrase_matcher.batch_count, 2)
+
+def sequential_apply(words, phrases):
+    sentence = Sentence(words)
+    counts = []
+    for phrase, replacement_word in phrases:
+        counts.append(sentence.count(phrase))
+        sentence = sentence.replace_multi_word_sequence(phrase, replacement_word)
+    return list(sentence.words), counts
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from dotenv import dotenv_values
+
+from preprocess.preprocessor import run_nlp_mtl_preprocessor, setup_nlp_mtl_preprocessor
+
+class PreprocessorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.working_folder = tempfile.TemporaryDirectory()
+        self.previous_working_folder = os.getcwd()
+        os.chdir(self.working_folder.name)
+
+    def tearDown(self):
+        os.chdir(self.previous_working_folder)
+        self.working_folder.cleanup()
+
+    def test_setup_spacy_settings_reach_spacy_tokenizer(self):
+        with open("replacement_table.json", "w") as replacement_table_file:
+            replacement_table_file.write(json.dumps({"names": {"Emilia": "エミリア"}}))
+        with open("chapter.txt", "w") as chapter_file:
+            chapter_file.write("エミリア")
+        initial_answers = {
+            "tokenizer": "spacy",
+            "replacement_table_json": "replacement_table.json",
+            "tag_potential_proper_nouns": "Yes",
+            "use_single_kanji_filter": "No",
+            "use_user_dict": "No",
+            "columnar_sentences": "No",
+            "windowed_tagging": "No",
+            "hybrid": "No",
+            "tokenization_chunk_size": "",
+        }
+        additional_answers = {
+            "spacy_model": "ja_core_news_sm",
+            "spacy_batch_size": "64",
+            "spacy_n_process": "2",
+        }
+        with patch("inquirer.prompt", side_effect=[initial_answers, additional_answers]):
+            setup_nlp_mtl_preprocessor()
+        with patch.dict(os.environ, dotenv_values(".env")), \
+             patch("preprocess.preprocessor.SpacyTokenizer") as spacy_tokenizer, \
+             patch("preprocess.preprocessor.Tagger"), \
+             patch("preprocess.preprocessor.NLP_MTL_Preprocess") as nlp_mtl_preprocess:
+            nlp_mtl_preprocess.return_value.replace.return_value = "Emilia"
+            run_nlp_mtl_preprocessor(argparse.Namespace(input_file="chapter.txt", verbose=False))
+        spacy_tokenizer.assert_called_once_with(
+            model="ja_core_news_sm",
+            batch_size=64,
+            n_process=2,
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+
+from preprocess.nlp_mtl_preprocess import NLP_MTL_Preprocess
+from preprocess.replacement_plan import ReplacementOperation, ReplacementPlan
+
+class ReplacementPlanTestCase(unittest.TestCase):
+    def test_compile_term_replacement(self):
+        replacement_table = {
+            "basic": {
+                "『": "«",
+                "』": "»"
+            }
+        }
+        plan = NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
+        basic_rule_index = 1
+        expected = [
+            ReplacementOperation(basic_rule_index, "『", "«"),
+            ReplacementOperation(basic_rule_index, "』", "»"),
+        ]
+        actual = plan.get_rule_operations(basic_rule_index)
+        self.assertEqual(actual, expected)
+
+    def test_compile_name_replacement_with_honorifics(self):
+        replacement_table = {
+            "single-names": {
+                "Al": "アル"
+            },
+            "honorifics": {
+                "さん": "san"
+            }
+        }
+        plan = NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
+        single_names_rule_index = 4
+        expected = [
+            ReplacementOperation(
+                single_names_rule_index, "アルさん", "Al-san", "san", False, "アル", "Al"
+            ),
+            ReplacementOperation(
+                single_names_rule_index, "アル", "Al", "NA", False, "アル", "Al"
+            ),
+        ]
+        actual = plan.get_rule_operations(single_names_rule_index)
+        self.assertEqual(actual, expected)
+
+    def test_compile_skips_previously_replaced_names(self):
+        replacement_table = {
+            "full-names": {
+                "Natsuki Subaru": ["菜月", "昴"],
+                "Natsuki Kenichi": ["菜月", "賢一"],
+            }
+        }
+        plan = NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
+        expected = ["菜月・昴", "菜月昴", "菜月", "昴", "菜月・賢一", "菜月賢一", "賢一"]
+        actual = [operation.pattern for operation in plan.operations]
+        self.assertEqual(actual, expected)
+
+    def test_compile_marks_single_kanji_names(self):
+        replacement_table = {
+            "full-names": {
+                "Karuizawa Kei": ["軽井沢", "恵"],
+            }
+        }
+        plan = NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
+        expected = ["恵"]
+        actual = [
+            operation.pattern for operation in plan.operations if operation.is_single_kanji
+        ]
+        self.assertEqual(actual, expected)
+
+    def test_compile_error_mismatched_name_parts(self):
+        replacement_table = {
+            "names": {
+                "Wilhelm van Astrea": ["ヴィルヘルム", "アストレア"],
+            }
+        }
+        with self.assertRaises(ValueError):
+            NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
+
+    def test_save_and_load(self):
+        replacement_table = {
+            "names": {
+                "Wilhelm van Astrea": ["ヴィルヘルム", "ヴァン", "アストレア"],
+            },
+            "honorifics": {
+                "さん": "san"
+            }
+        }
+        expected = NLP_MTL_Preprocess.compile_replacement_plan(replacement_table)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "plan.json")
+            expected.save(filename)
+            actual = ReplacementPlan.load(filename)
+        self.assertEqual(actual, expected)
+
+    def test_load_or_compile_uses_cached_plan(self):
+        replacement_table = {
+            "single-names": {
+                "Al": "アル"
+            }
+        }
+        compiled_plans = []
+        def compile_plan(table):
+            plan = NLP_MTL_Preprocess.compile_replacement_plan(table)
+            compiled_plans.append(plan)
+            return plan
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_folder = os.path.join(temp_dir, "cache")
+            expected = ReplacementPlan.load_or_compile(
+                "nlp", replacement_table, compile_plan, cache_folder
+            )
+            actual = ReplacementPlan.load_or_compile(
+                "nlp", replacement_table, compile_plan, cache_folder
+            )
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(compiled_plans), 1)
+
+    def test_load_or_compile_recompiles_corrupt_cached_plan(self):
+        replacement_table = {
+            "single-names": {
+                "Al": "アル"
+            }
+        }
+        compiled_plans = []
+        def compile_plan(table):
+            plan = NLP_MTL_Preprocess.compile_replacement_plan(table)
+            compiled_plans.append(plan)
+            return plan
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_folder = os.path.join(temp_dir, "cache")
+            expected = ReplacementPlan.load_or_compile(
+                "nlp", replacement_table, compile_plan, cache_folder
+            )
+            for cache_filename in os.listdir(cache_folder):
+                with open(os.path.join(cache_folder, cache_filename), "r+") as cache_file:
+                    cache_file.truncate(10)
+            actual = ReplacementPlan.load_or_compile(
+                "nlp", replacement_table, compile_plan, cache_folder
+            )
+            reloaded = ReplacementPlan.load_or_compile(
+                "nlp", replacement_table, compile_plan, cache_folder
+            )
+        self.assertEqual(actual, expected)
+        self.assertEqual(reloaded, expected)
+        self.assertEqual(len(compiled_plans), 2)
+
+    def test_hash_replacement_table_depends_on_key_order(self):
+        table_hash = ReplacementPlan.hash_replacement_table({"basic": {"a": "b", "c": "d"}})
+        reordered_table_hash = ReplacementPlan.hash_replacement_table({"basic": {"c": "d", "a": "b"}})
+        self.assertNotEqual(table_hash, reordered_table_hash)
+
+if __name__ == "__main__":
+    unittest.main()
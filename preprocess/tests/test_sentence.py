@@ -1,6 +1,8 @@
 import unittest
 
-from preprocess.sentence import Sentence, Word
+from preprocess.phrase_matcher import PhraseMatcher
+from preprocess.sentence import Sentence, Word, intern_word
+from preprocess.tokenizer.part_of_speech import PartOfSpeech
 
 class SentenceTestCase(unittest.TestCase):
 
@@ -140,6 +142,81 @@ class SentenceTestCase(unittest.TestCase):
         )
         self.assertEqual(actual, expected)
 
+    def test_replace_word_and_count_multi_occurence(self):
+        original_sentence = generate_sentence("本", "本")
+        expected = (generate_sentence("鞄", "鞄"), 2)
+        actual = original_sentence.replace_word_and_count(
+            Word(text='本', part_of_speech='名詞'),
+            "鞄"
+        )
+        self.assertEqual(actual, expected)
+
+    def test_replace_word_and_count_no_occurence_returns_same_sentence(self):
+        original_sentence = generate_sentence("本")
+        actual_sentence, actual_count = original_sentence.replace_word_and_count(
+            Word(text='鉛筆', part_of_speech='名詞'),
+            "鞄"
+        )
+        self.assertIs(actual_sentence, original_sentence)
+        self.assertEqual(actual_count, 0)
+
+    def test_replace_and_count_multi_word_multi_occurence(self):
+        original_sentence = generate_sentence("本", "本")
+        expected = (
+            Sentence([
+                Word(text='その靴', part_of_speech='NA'),
+                Word(text='は', part_of_speech='助詞'), 
+                Word(text='私', part_of_speech='代名詞'), 
+                Word(text='の', part_of_speech='助詞'),
+                Word(text='本', part_of_speech='名詞'),
+                Word(text='です', part_of_speech='助動詞'),
+                Word(text='。', part_of_speech='補助記号')
+            ]),
+            1
+        )
+        actual = original_sentence.replace_and_count(
+            "この本",
+            Word(text='その靴', part_of_speech='NA'),
+        )
+        self.assertEqual(actual, expected)
+
+    def test_replace_and_count_partial_match_returns_same_sentence(self):
+        original_sentence = generate_sentence("鉛筆")
+        actual_sentence, actual_count = original_sentence.replace_and_count(
+            "鉛",
+            Word(text='鞄', part_of_speech='名詞'),
+        )
+        self.assertIs(actual_sentence, original_sentence)
+        self.assertEqual(actual_count, 0)
+
+    def test_apply_phrases_multi_phrase_multi_occurence(self):
+        original_sentence = generate_sentence("本", "本")
+        expected = (
+            Sentence([
+                Word(text='その靴', part_of_speech='NA'),
+                Word(text='は', part_of_speech='助詞'), 
+                Word(text='私', part_of_speech='代名詞'), 
+                Word(text='の', part_of_speech='助詞'),
+                Word(text='靴', part_of_speech='NA'),
+                Word(text='です', part_of_speech='助動詞'),
+                Word(text='。', part_of_speech='補助記号')
+            ]),
+            [1, 1]
+        )
+        actual = original_sentence.apply_phrases(PhraseMatcher([
+            ("この本", Word(text='その靴', part_of_speech='NA')),
+            ("本", Word(text='靴', part_of_speech='NA')),
+        ]))
+        self.assertEqual(actual, expected)
+
+    def test_apply_phrases_no_occurence(self):
+        original_sentence = generate_sentence("本")
+        expected = (original_sentence, [0])
+        actual = original_sentence.apply_phrases(PhraseMatcher([
+            ("鉛筆", Word(text='靴', part_of_speech='NA')),
+        ]))
+        self.assertEqual(actual, expected)
+
     def test_count_single_word_single_occurence(self):
         original_sentence = generate_sentence("本")
         expected = 1
@@ -236,6 +313,17 @@ class SentenceTestCase(unittest.TestCase):
         )
         self.assertEqual(actual, expected)
 
+    def test_intern_word_returns_same_word(self):
+        expected = intern_word("本", "名詞")
+        actual = intern_word("本", "名詞")
+        self.assertIs(actual, expected)
+        self.assertEqual(actual, Word(text="本", part_of_speech="名詞"))
+
+    def test_intern_word_part_of_speech_enum(self):
+        expected = intern_word("本", "名詞")
+        actual = intern_word("本", PartOfSpeech.NOUN)
+        self.assertIs(actual, expected)
+
     def test_get_word_index_from_char_index_first_char(self):
         sentence = Sentence([
             Word(text='私', part_of_speech='代名詞'), 
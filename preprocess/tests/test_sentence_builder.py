@@ -0,0 +1,220 @@
+import unittest
+
+from preprocess.columnar_sentence import ColumnarSentence
+from preprocess.phrase_matcher import PhraseMatcher, compile_phrases
+from preprocess.sentence import Sentence, Word
+from preprocess.sentence_builder import SentenceBuilder
+
+class SentenceBuilderTestCase(unittest.TestCase):
+    def test_build_without_edits_returns_original_sentence(self):
+        sentence = generate_sentence()
+        builder = SentenceBuilder(sentence)
+        self.assertIs(builder.build(), sentence)
+
+    def test_replace_and_count(self):
+        builder = SentenceBuilder(generate_sentence())
+        expected_sentence = Sentence([
+            Word(text='Subaru-kun', part_of_speech='NA'),
+            Word(text='と', part_of_speech='助詞'),
+            Word(text='スバル', part_of_speech='固有名詞'),
+            Word(text='。', part_of_speech='補助記号'),
+        ])
+        actual_count = builder.replace_and_count(
+            "スバルくん", 
+            Word(text='Subaru-kun', part_of_speech='NA')
+        )
+        self.assertEqual(actual_count, 1)
+        self.assertEqual(builder.build(), expected_sentence)
+        self.assertEqual(str(builder), "Subaru-kunとスバル。")
+        self.assertEqual(len(builder), 4)
+
+    def test_replace_word_and_count(self):
+        builder = SentenceBuilder(generate_sentence())
+        expected_sentence = Sentence([
+            Word(text='Subaru', part_of_speech='固有名詞'),
+            Word(text='くん', part_of_speech='接尾辞'),
+            Word(text='と', part_of_speech='助詞'),
+            Word(text='Subaru', part_of_speech='固有名詞'),
+            Word(text='。', part_of_speech='補助記号'),
+        ])
+        actual_count = builder.replace_word_and_count(
+            Word(text='スバル', part_of_speech='固有名詞'),
+            "Subaru"
+        )
+        self.assertEqual(actual_count, 2)
+        self.assertEqual(builder.build(), expected_sentence)
+
+    def test_replace_word_and_count_no_occurence(self):
+        sentence = generate_sentence()
+        builder = SentenceBuilder(sentence)
+        actual_count = builder.replace_word_and_count(
+            Word(text='スバル', part_of_speech='名詞'),
+            "Subaru"
+        )
+        self.assertEqual(actual_count, 0)
+        self.assertIs(builder.build(), sentence)
+
+    def test_replace_words_and_count(self):
+        builder = SentenceBuilder(generate_sentence())
+        actual_counts = builder.replace_words_and_count([
+            (Word(text='スバル', part_of_speech='固有名詞'), "Subaru"),
+            (Word(text='と', part_of_speech='助詞'), "and"),
+            (Word(text='スバル', part_of_speech='固有名詞'), "Natsuki"),
+        ])
+        self.assertEqual(actual_counts, [2, 1, 0])
+        self.assertEqual(str(builder), "SubaruくんandSubaru。")
+
+    def test_apply_phrases_matches_sentence(self):
+        sentence = generate_sentence()
+        phrase_matcher = PhraseMatcher([
+            ("スバルくん", Word(text='Subaru-kun', part_of_speech='NA')),
+            ("Subaru-kunと", Word(text='With Subaru-kun', part_of_speech='NA')),
+            ("スバル", Word(text='Subaru', part_of_speech='NA')),
+        ])
+        expected_sentence, expected_counts = sentence.apply_phrases(phrase_matcher)
+        builder = SentenceBuilder(sentence)
+        actual_counts = builder.apply_phrases(phrase_matcher)
+        self.assertEqual(actual_counts, expected_counts)
+        self.assertEqual(builder.build(), expected_sentence)
+
+    def test_replacements_across_removed_words(self):
+        builder = SentenceBuilder(generate_sentence())
+        builder.replace_and_count("スバルくん", Word(text='Subaru-kun', part_of_speech='NA'))
+        actual_count = builder.replace_and_count(
+            "Subaru-kunと",
+            Word(text='With Subaru-kun', part_of_speech='NA')
+        )
+        self.assertEqual(actual_count, 1)
+        self.assertEqual(str(builder), "With Subaru-kunスバル。")
+
+    def test_get_word_index_from_char_index_after_edit(self):
+        sentence = generate_sentence()
+        builder = SentenceBuilder(sentence)
+        builder.replace_and_count("スバルくん", Word(text='Subaru-kun', part_of_speech='NA'))
+        expected_sentence = builder.build()
+        for char_index in range(len(str(expected_sentence))):
+            with self.subTest(char_index=char_index):
+                self.assertEqual(
+                    builder.get_word_index_from_char_index(char_index),
+                    expected_sentence.get_word_index_from_char_index(char_index)
+                )
+
+    def test_single_phrase_queries_not_cached(self):
+        builder = SentenceBuilder(generate_sentence())
+        cache_size = compile_phrases.cache_info().currsize
+        builder.count("スバル")
+        builder.replace_and_count("スバルくん", Word(text='Subaru-kun', part_of_speech='NA'))
+        self.assertEqual(compile_phrases.cache_info().currsize, cache_size)
+
+    def test_get_word_index_from_char_index_error_out_of_bounds(self):
+        builder = SentenceBuilder(generate_sentence())
+        with self.assertRaises(IndexError):
+            builder.get_word_index_from_char_index(len(str(builder)))
+
+class IndexedSentenceBuilderTestCase(unittest.TestCase):
+    def test_count(self):
+        sentence = generate_sentence()
+        builder = SentenceBuilder(sentence, index_words=True)
+        for query in ["スバル", "スバルくん", "バル", "くんと", "。"]:
+            with self.subTest(query=query):
+                self.assertEqual(builder.count(query), sentence.count(query))
+
+    def test_count_word(self):
+        builder = SentenceBuilder(generate_sentence(), index_words=True)
+        expected = 2
+        actual = builder.count_word(Word(text='スバル', part_of_speech='固有名詞'))
+        self.assertEqual(actual, expected)
+
+    def test_index_updated_after_replacement(self):
+        builder = SentenceBuilder(generate_sentence(), index_words=True)
+        builder.replace_and_count("スバルくん", Word(text='Subaru-kun', part_of_speech='NA'))
+        self.assertEqual(builder.count_word(Word(text='スバル', part_of_speech='固有名詞')), 1)
+        self.assertEqual(builder.count("Subaru-kunと"), 1)
+        actual_count = builder.replace_word_and_count(
+            Word(text='Subaru-kun', part_of_speech='NA'),
+            "Subaru"
+        )
+        self.assertEqual(actual_count, 1)
+        self.assertEqual(str(builder), "Subaruとスバル。")
+
+    def test_replace_words_and_count_matches_unindexed(self):
+        replacements = [
+            (Word(text='スバル', part_of_speech='固有名詞'), "Subaru"),
+            (Word(text='くん', part_of_speech='固有名詞'), "kun"),
+            (Word(text='。', part_of_speech='補助記号'), "."),
+        ]
+        builder = SentenceBuilder(generate_sentence())
+        indexed_builder = SentenceBuilder(generate_sentence(), index_words=True)
+        expected_counts = builder.replace_words_and_count(replacements)
+        actual_counts = indexed_builder.replace_words_and_count(replacements)
+        self.assertEqual(actual_counts, expected_counts)
+        self.assertEqual(indexed_builder.build(), builder.build())
+
+    def test_apply_phrases_matches_unindexed(self):
+        phrase_matcher = PhraseMatcher([
+            ("スバルくん", Word(text='Subaru-kun', part_of_speech='NA')),
+            ("Subaru-kunと", Word(text='With Subaru-kun', part_of_speech='NA')),
+            ("スバル", Word(text='Subaru', part_of_speech='NA')),
+        ])
+        builder = SentenceBuilder(generate_sentence())
+        indexed_builder = SentenceBuilder(generate_sentence(), index_words=True)
+        expected_counts = builder.apply_phrases(phrase_matcher)
+        actual_counts = indexed_builder.apply_phrases(phrase_matcher)
+        self.assertEqual(actual_counts, expected_counts)
+        self.assertEqual(indexed_builder.build(), builder.build())
+
+class ColumnarSentenceBuilderTestCase(unittest.TestCase):
+    def test_build_without_edits_returns_original_sentence(self):
+        sentence = ColumnarSentence.from_words(generate_sentence().words)
+        builder = SentenceBuilder(sentence, index_words=True)
+        self.assertIs(builder.build(), sentence)
+
+    def test_apply_phrases_matches_sentence(self):
+        phrase_matcher = PhraseMatcher([
+            ("スバルくん", Word(text='Subaru-kun', part_of_speech='NA')),
+            ("Subaru-kunと", Word(text='With Subaru-kun', part_of_speech='NA')),
+            ("。", Word(text='', part_of_speech='NA')),
+        ])
+        for index_words in [False, True]:
+            with self.subTest(index_words=index_words):
+                builder = SentenceBuilder(generate_sentence(), index_words=index_words)
+                columnar_builder = SentenceBuilder(
+                    ColumnarSentence.from_words(generate_sentence().words),
+                    index_words=index_words
+                )
+                expected_counts = builder.apply_phrases(phrase_matcher)
+                actual_counts = columnar_builder.apply_phrases(phrase_matcher)
+                self.assertEqual(actual_counts, expected_counts)
+                self.assertEqual(str(columnar_builder), str(builder))
+                self.assertEqual(len(columnar_builder), len(builder))
+                actual_sentence = columnar_builder.build()
+                self.assertIsInstance(actual_sentence, ColumnarSentence)
+                self.assertEqual(actual_sentence, builder.build())
+
+    def test_replace_words_and_count_matches_sentence(self):
+        replacements = [
+            (Word(text='スバル', part_of_speech='固有名詞'), "Subaru"),
+            (Word(text='。', part_of_speech='補助記号'), "."),
+        ]
+        builder = SentenceBuilder(generate_sentence(), index_words=True)
+        columnar_builder = SentenceBuilder(
+            ColumnarSentence.from_words(generate_sentence().words), 
+            index_words=True
+        )
+        expected_counts = builder.replace_words_and_count(replacements)
+        actual_counts = columnar_builder.replace_words_and_count(replacements)
+        self.assertEqual(actual_counts, expected_counts)
+        self.assertEqual(columnar_builder.build(), builder.build())
+        self.assertEqual(columnar_builder.get_word_index_from_char_index(8), 2)
+
+def generate_sentence():
+    return Sentence([
+        Word(text='スバル', part_of_speech='固有名詞'),
+        Word(text='くん', part_of_speech='接尾辞'),
+        Word(text='と', part_of_speech='助詞'),
+        Word(text='スバル', part_of_speech='固有名詞'),
+        Word(text='。', part_of_speech='補助記号'),
+    ])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import pickle
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import spacy
+import sudachidict_core
+
+from preprocess.tokenizer.spacy_tokenizer import SpacyTokenizer, _UserDicJapaneseTokenizer
+
+# Name that Sudachi splits up unless it is in the user dic
+USER_DIC_NAME = "ペトラレイテ"
+
+SAMPLE_TEXTS = [f"{USER_DIC_NAME}とエミリア", "", "「レム」は話した。"] * 10
+
+# The ja_core_news models aren't needed to test tokenization, so a blank
+# Japanese pipeline is loaded in their place
+def load_blank_pipeline(*args, **kwargs):
+    return spacy.blank("ja")
+
+class SpacyTokenizerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.user_dic_folder = tempfile.TemporaryDirectory()
+        csv_file_name = os.path.join(cls.user_dic_folder.name, "user.csv")
+        with open(csv_file_name, "w") as csv_file:
+            csv_file.write(
+                f'{USER_DIC_NAME},4786,4786,5000,{USER_DIC_NAME},名詞,固有名詞,一般,*,*,*,'
+                f'{USER_DIC_NAME},{USER_DIC_NAME},*,*,*,*,*'
+            )
+        cls.user_dic_path = os.path.join(cls.user_dic_folder.name, "user.dic")
+        system_dic_path = os.path.join(
+            os.path.dirname(sudachidict_core.__file__),
+            "resources",
+            "system.dic"
+        )
+        subprocess.run(
+            ["sudachipy", "ubuild", "-o", cls.user_dic_path, "-s", system_dic_path, csv_file_name],
+            check=True,
+            capture_output=True
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.user_dic_folder.cleanup()
+
+    def test_user_dic_japanese_tokenizer_pickle_round_trip(self):
+        nlp = spacy.blank("ja")
+        tokenizer = _UserDicJapaneseTokenizer(nlp.vocab, None, self.user_dic_path)
+        actual = pickle.loads(pickle.dumps(tokenizer))
+        self.assertIsInstance(actual, _UserDicJapaneseTokenizer)
+        self.assertEqual(actual.user_dic_path, self.user_dic_path)
+        self.assertEqual([token.text for token in actual(SAMPLE_TEXTS[0])][0], USER_DIC_NAME)
+
+    def test_tokenize_many_multiple_processes_matches_tokenize(self):
+        for user_dic_path in [None, self.user_dic_path]:
+            with self.subTest(user_dic_path=user_dic_path), \
+                 patch("spacy.load", side_effect=load_blank_pipeline):
+                tokenizer = SpacyTokenizer(user_dic_path=user_dic_path)
+                multiprocess_tokenizer = SpacyTokenizer(
+                    user_dic_path=user_dic_path,
+                    batch_size=4,
+                    n_process=2
+                )
+                expected = [tokenizer.tokenize(text) for text in SAMPLE_TEXTS]
+                actual = multiprocess_tokenizer.tokenize_many(SAMPLE_TEXTS)
+                self.assertEqual(actual, expected)
+                expected = [tokenizer.tokenize_spans(text) for text in SAMPLE_TEXTS]
+                actual = multiprocess_tokenizer.tokenize_spans_many(SAMPLE_TEXTS)
+                self.assertEqual(actual, expected)
+                if user_dic_path is None:
+                    self.assertNotEqual(actual[0][0][0].text, USER_DIC_NAME)
+                else:
+                    self.assertEqual(actual[0][0][0].text, USER_DIC_NAME)
+
+if __name__ == "__main__":
+    unittest.main()
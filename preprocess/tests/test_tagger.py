@@ -1,9 +1,14 @@
+import tracemalloc
 import unittest
 from unittest.mock import MagicMock
 
+from preprocess.columnar_sentence import ColumnarSentence
 from preprocess.tokenizer.fugashi_tokenizer import FugashiTokenizer
+from preprocess.tokenizer.sudachi_tokenizer import SudachiTokenizer
+from preprocess.tokenizer.tokenizer import Tokenizer
 from preprocess.tagger import Tagger
-from preprocess.sentence import Word
+from preprocess.sentence import Sentence, Word
+from preprocess.sentence_builder import SentenceBuilder
 
 class TestTagger(unittest.TestCase):
     def test_tag_with_word_list_empty_word_list(self):
@@ -117,3 +122,267 @@ class TestTagger(unittest.TestCase):
         expected = [Word("アルデバラン", "固有名詞")]
         actual = tagger._tag_with_word_list(sample_text, sample_word_list)
         self.assertEqual(actual, expected)
+
+    def test_validate_tagging_placeholder(self):
+        sample_text = "「ア ル」"
+        sample_sentence = Sentence([
+            Word("「", "補助記号"),
+            Word("ア", "名詞"),
+            Word("$$$", "補助記号"),
+            Word("ル", "名詞"),
+            Word("」", "補助記号"),
+        ])
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        expected = Sentence([
+            Word("「", "補助記号"),
+            Word("ア", "名詞"),
+            Word(" ", "補助記号"),
+            Word("ル", "名詞"),
+            Word("」", "補助記号"),
+        ])
+        actual = tagger._validate_tagging(sample_text, sample_sentence)
+        self.assertEqual(actual, expected)
+
+    def test_validate_tagging_placeholder_in_punctuation_word(self):
+        sample_text = "ア・・ル」　"
+        sample_sentence = Sentence([
+            Word("ア", "名詞"),
+            Word("$$$$$", "補助記号"),
+            Word("$", "補助記号"),
+            Word("ル", "名詞"),
+            Word("」$$$", "補助記号"),
+        ])
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        expected = tagger._validate_tagging_with_sequence_matcher(sample_text, sample_sentence)
+        actual = tagger._validate_placeholder_tagging(sample_text, sample_sentence)
+        self.assertEqual(actual, expected)
+        self.assertEqual(str(actual), sample_text)
+
+    def test_validate_tagging_placeholder_in_non_punctuation_word(self):
+        sample_text = "ア ル"
+        sample_sentence = Sentence([
+            Word("ア$$$ル", "名詞"),
+        ])
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        self.assertIsNone(tagger._validate_placeholder_tagging(sample_text, sample_sentence))
+        with self.assertRaises(RuntimeError):
+            tagger._validate_tagging(sample_text, sample_sentence)
+
+    def test_validate_tagging_falls_back_for_other_discrepancies(self):
+        sample_text = "ア！ル"
+        sample_sentence = Sentence([
+            Word("ア", "名詞"),
+            Word("!", "補助記号"),
+            Word("ル", "名詞"),
+        ])
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        expected = Sentence([
+            Word("ア", "名詞"),
+            Word("！", "補助記号"),
+            Word("ル", "名詞"),
+        ])
+        self.assertIsNone(tagger._validate_placeholder_tagging(sample_text, sample_sentence))
+        actual = tagger._validate_tagging(sample_text, sample_sentence)
+        self.assertEqual(actual, expected)
+
+    def test_tag_validates_normalized_word_text(self):
+        # Normalizes full width punctuation, and relies on the default
+        # Tokenizer.tokenize_spans, which builds spans from word lengths
+        class NormalizingTokenizer(Tokenizer):
+            def tokenize(self, text:str):
+                return [Word("猫", "名詞"), Word("!", "補助記号")]
+        tagger = Tagger(tokenizer=NormalizingTokenizer(), tag_potential_proper_nouns=False)
+        expected = [
+            Word("猫", "名詞"),
+            Word("！", "補助記号"),
+        ]
+        actual = tagger.tag("猫！")
+        self.assertEqual(list(actual.words), expected)
+
+    def test_tokenize_spans_skipped_whitespace(self):
+        sample_text = "アル と ル"
+        tokenizer = FugashiTokenizer()
+        word_spans = tokenizer.tokenize_spans(sample_text)
+        expected = [word.text for word, _, _ in word_spans]
+        actual = [
+            sample_text[starting_index:ending_index] 
+            for _, starting_index, ending_index in word_spans
+        ]
+        self.assertEqual(actual, expected)
+        self.assertEqual(word_spans[-1][2], len(sample_text))
+
+    def test_tag_line_restores_placeholders(self):
+        sample_text = "「アル　と・ル」 "
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        preprocessed_sentence = Sentence(
+            tagger._tokenizer.tokenize(tagger._preprocess_text(sample_text))
+        )
+        expected = tagger._validate_tagging_with_sequence_matcher(sample_text, preprocessed_sentence)
+        actual = tagger.tag_line(sample_text)
+        self.assertEqual(actual, expected)
+        self.assertEqual(str(actual), sample_text)
+
+    def test_tag_with_word_list_earlier_word_takes_precedence_over_position(self):
+        sample_text = "アルデバランとスバル"
+        sample_word_list = [
+            Word("スバル", "固有名詞"),
+            Word("アルデ", "固有名詞"),
+            Word("アル", "固有名詞"),
+            Word("バラン", "固有名詞"),
+        ]
+        tokenizer = FugashiTokenizer()
+        tagger = Tagger(tokenizer=tokenizer)
+        expected = [
+            Word("アルデ", "固有名詞"),
+            Word("バラン", "固有名詞"),
+        ] + tokenizer.tokenize("と") + [
+            Word("スバル", "固有名詞"),
+        ]
+        actual = tagger._tag_with_word_list(sample_text, sample_word_list, True)
+        self.assertEqual(actual, expected)
+
+    def test_name_cache_reuses_subdivided_names(self):
+        sample_text = "エミリアとエミリア"
+        tagger = Tagger(tokenizer=FugashiTokenizer(), proper_noun_list=["エミリア"])
+        expected = [Word("エミリア", "固有名詞"), Word("と", "助詞"), Word("エミリア", "固有名詞")]
+        actual = tagger.tag_line(sample_text)
+        self.assertEqual(list(actual.words), expected)
+        name_cache_info = tagger.name_cache_info()
+        self.assertEqual(name_cache_info.hits, 1)
+        self.assertEqual(name_cache_info.misses, 2)
+
+    def test_name_cache_evicts_least_recently_used(self):
+        tagger = Tagger(tokenizer=FugashiTokenizer(), name_cache_size=2)
+        tagger._get_name_subwords("アル")
+        tagger._get_name_subwords("スバル")
+        tagger._get_name_subwords("アル")
+        tagger._get_name_subwords("レム")
+        self.assertEqual(list(tagger._name_cache.keys()), ["アル", "レム"])
+        self.assertEqual(tagger.name_cache_info().current_size, 2)
+
+    def test_set_proper_noun_list_clears_name_cache(self):
+        sample_text = "アルデバラン"
+        tagger = Tagger(tokenizer=FugashiTokenizer(), proper_noun_list=["アルデバラン"])
+        tagger.tag_line(sample_text)
+        tagger.set_proper_noun_list(["アル", "バラン"])
+        expected = [Word("アル", "固有名詞"), Word("デ", "名詞"), Word("バラン", "固有名詞")]
+        actual = tagger.tag_line(sample_text)
+        self.assertEqual([word.text for word in actual.words], [word.text for word in expected])
+
+    def test_tag_only_tagged_line_indexes(self):
+        sample_text = "エミリア\n\nスバルとレム"
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        expected = list(tagger.tag_line("エミリア").words) + [
+            Word("\n", "空白"),
+            Word("\n", "空白"),
+            Word("スバルとレム", Tagger.UNTAGGED_PART_OF_SPEECH),
+        ]
+        actual = tagger.tag(sample_text, tagged_line_indexes={0})
+        self.assertEqual(list(actual.words), expected)
+
+    def test_tokenize_many_matches_tokenize(self):
+        sample_texts = ["エミリアとスバル", "", "「レム」　は、話した。"]
+        tokenizer = FugashiTokenizer()
+        expected = [tokenizer.tokenize(text) for text in sample_texts]
+        actual = tokenizer.tokenize_many(sample_texts)
+        self.assertEqual(actual, expected)
+        expected = [tokenizer.tokenize_spans(text) for text in sample_texts]
+        actual = tokenizer.tokenize_spans_many(sample_texts)
+        self.assertEqual(actual, expected)
+
+    def test_tag_matches_tag_line(self):
+        sample_text = "エミリアとスバル\n\n「レム」は話した。"
+        tagger = Tagger(tokenizer=FugashiTokenizer())
+        expected = list(tagger.tag_line("エミリアとスバル").words) + [
+            Word("\n", "空白"),
+            Word("\n", "空白"),
+        ] + list(tagger.tag_line("「レム」は話した。").words)
+        actual = tagger.tag(sample_text)
+        self.assertEqual(list(actual.words), expected)
+
+    def test_tag_tokenization_chunks(self):
+        sample_text = "エミリアとスバル\n\n※　※\n「レム」は話した。"
+        tagger = Tagger(tokenizer=FugashiTokenizer(), tokenization_chunk_size=100)
+        expected = list(tagger.tag_line("エミリアとスバル").words) + [
+            Word("\n", "空白"),
+            Word("\n", "空白"),
+            Word("※　※", "補助記号"),
+            Word("\n", "空白"),
+        ] + list(tagger.tag_line("「レム」は話した。").words)
+        actual = tagger.tag(sample_text)
+        self.assertEqual(list(actual.words), expected)
+
+    def test_tag_tokenization_chunk_size(self):
+        sample_text = "エミリアとスバル\n\n※　※\n「レム」は話した。\nレム"
+        tokenizer = MagicMock(wraps=FugashiTokenizer())
+        tagger = Tagger(tokenizer=tokenizer, tokenization_chunk_size=12)
+        tagger.tag(sample_text)
+        tokenizer.tokenize_spans_many.assert_any_call(
+            ["エミリアとスバル", "「レム」は話した。\nレム"]
+        )
+
+    def test_tag_columnar_sentences_matches_tag(self):
+        sample_text = "エミリアとスバル\n\n「レム」は話した。\nスバルくん"
+        tagger = Tagger(tokenizer=FugashiTokenizer(), proper_noun_list=["スバル"])
+        for tagged_line_indexes in [None, {0, 3}]:
+            with self.subTest(tagged_line_indexes=tagged_line_indexes):
+                expected = tagger.tag(sample_text, tagged_line_indexes)
+                actual = tagger.tag(sample_text, tagged_line_indexes, columnar_sentences=True)
+                self.assertIsInstance(actual, ColumnarSentence)
+                self.assertEqual(actual, expected)
+
+    def test_tag_columnar_sentences_uses_less_memory(self):
+        sample_text = "\n".join(
+            f"スバルくんは{i}日目に王都の市場を歩いた。" for i in range(1000)
+        )
+        tagger = Tagger(tokenizer=FugashiTokenizer(), proper_noun_list=["スバル"])
+        # Tag once beforehand, so that the memory held by interned words
+        # and the name cache is not counted
+        tagger.tag(sample_text)
+        tagged_sizes = {}
+        replaced_sizes = {}
+        for columnar_sentences in [False, True]:
+            tracemalloc.start()
+            try:
+                sentence = tagger.tag(sample_text, columnar_sentences=columnar_sentences)
+                tagged_sizes[columnar_sentences] = tracemalloc.get_traced_memory()[0]
+                sentence_builder = SentenceBuilder(sentence)
+                sentence_builder.replace_and_count("スバルくん", Word("Subaru-kun", "NA"))
+                sentence = sentence_builder.build()
+                del sentence_builder
+                replaced_sizes[columnar_sentences] = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            del sentence
+        self.assertLess(tagged_sizes[True] * 3, tagged_sizes[False])
+        self.assertLess(replaced_sizes[True] * 3, replaced_sizes[False])
+
+    def test_tag_tokenization_chunks_within_max_input_bytes(self):
+        sample_text = "エミリアとスバル\n「レム」は話した。\nレム"
+        tokenizer = MagicMock(wraps=FugashiTokenizer())
+        tokenizer.get_max_input_bytes.return_value = 30
+        tagger = Tagger(tokenizer=tokenizer, tokenization_chunk_size=100)
+        tagger.tag(sample_text)
+        tokenizer.tokenize_spans_many.assert_any_call(
+            ["エミリアとスバル", "「レム」は話した。", "レム"]
+        )
+
+    def test_tag_sudachi_tokenization_chunk_size_over_max_input_bytes(self):
+        sample_text = "\n".join(["エミリアとスバルは話した。"] * 2000)
+        tokenizer = SudachiTokenizer()
+        tagger = Tagger(tokenizer=tokenizer, tokenization_chunk_size=100000)
+        self.assertGreater(len(sample_text.encode("utf-8")), tokenizer.get_max_input_bytes())
+        actual = tagger.tag(sample_text)
+        self.assertEqual(str(actual), sample_text)
+
+    def test_fugashi_tokenize_matches_word_features(self):
+        sample_text = "エミリアは、\"東京\"で話した。a,b"
+        tokenizer = FugashiTokenizer()
+        expected = []
+        for word in tokenizer._tagger(sample_text):
+            part_of_speech = word.feature[0]
+            if word.feature[0] == "名詞" and word.feature[1] == "固有名詞":
+                part_of_speech = word.feature[1]
+            expected.append(Word(word.surface, part_of_speech))
+        actual = tokenizer.tokenize(sample_text)
+        self.assertEqual(actual, expected)
@@ -1,7 +1,8 @@
 import unittest
 
 from preprocess.utils import is_katakana, sort_list_by_string_length, \
-                             is_punctuation
+                             is_punctuation, classify_katakana, \
+                             classify_punctuation
 
 class UtilsTestCase(unittest.TestCase):
     def test_is_katakana_true_for_katakana_only_string(self):
@@ -80,5 +81,17 @@ class UtilsTestCase(unittest.TestCase):
         actual = is_punctuation(sample_str)
         self.assertFalse(actual)
 
+    def test_classify_katakana(self):
+        sample_list = ["アル", "アルさん", "", "・ー"]
+        expected = [True, False, True, True]
+        actual = classify_katakana(sample_list)
+        self.assertEqual(actual, expected)
+
+    def test_classify_punctuation(self):
+        sample_list = ["「」", "「a」", "　…"]
+        expected = [True, False, True]
+        actual = classify_punctuation(sample_list)
+        self.assertEqual(actual, expected)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
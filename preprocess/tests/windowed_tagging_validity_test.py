@@ -0,0 +1,59 @@
+# Test that only tagging the lines that contain names (windowed tagging)
+# produces the same output as tagging every line, for each corpus
+
+import glob
+import json
+
+from preprocess.tests.rezero_exhaustive_replacement_validity_test import (
+    build_nlp_preprocess_factory,
+    run_validity_test
+)
+from preprocess.tokenizer.sudachi_tokenizer import SudachiTokenizer
+
+# (docs folder, replacement table filename, Sudachi user dic path)
+CORPORA = [
+    (
+        "preprocess/tests/docs/rezero", 
+        "replacement_table/rezero.json", 
+        "data/dictionaries/rezero-sudachi.dic"
+    ),
+    (
+        "preprocess/tests/docs/cote", 
+        "replacement_table/cote.json", 
+        None
+    ),
+]
+
+def main():
+    for docs_folder, replacement_table_filename, sudachi_user_dic_path in CORPORA:
+        fileset = sorted(glob.glob(f"{docs_folder}/*.txt"))
+        if len(fileset) == 0:
+            print(f"Skipping {docs_folder}, as it contains no chapter files")
+            continue
+        sudachi_tokenizer = SudachiTokenizer(user_dic_path=sudachi_user_dic_path)
+        with open(replacement_table_filename) as replacement_table_file:
+            replacement_table = json.loads(replacement_table_file.read())
+        # Run with and without the single kanji filter, as it changes
+        # which names are replaced
+        for single_kanji_filter in [False, True]:
+            old_preprocess_factory = build_nlp_preprocess_factory(
+                replacement_table, 
+                sudachi_tokenizer,
+                single_kanji_filter=single_kanji_filter,
+            )
+            new_preprocess_factory = build_nlp_preprocess_factory(
+                replacement_table, 
+                sudachi_tokenizer,
+                single_kanji_filter=single_kanji_filter,
+                windowed_tagging=True,
+            )
+            run_validity_test(
+                fileset=fileset,
+                old_preprocess_name="Sudachi MTL Preprocess",
+                old_preprocess_factory=old_preprocess_factory,
+                new_preprocess_name="Windowed Sudachi MTL Preprocess",
+                new_preprocess_factory=new_preprocess_factory,
+            )
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 
 import fugashi
 
 from preprocess.tokenizer.tokenizer import Tokenizer
-from preprocess.sentence import Word
+from preprocess.sentence import Word, intern_word
 from preprocess.tokenizer.part_of_speech import PartOfSpeech
 
 class FugashiTokenizer(Tokenizer):
@@ -17,16 +17,53 @@ class FugashiTokenizer(Tokenizer):
             self._tagger = fugashi.Tagger()
 
     def tokenize(self, text:str) -> List[Word]:
-        word_list = []
-        tagged_words = self._tagger(text)
+        return [word for word, _, _ in self.tokenize_spans(text)]
+
+    def tokenize_spans(self, text:str) -> List[Tuple[Word, int, int]]:
+        return self._get_word_spans(self._tagger(text))
+
+    def tokenize_many(self, texts:Iterable[str]) -> List[List[Word]]:
+        return [
+            [word for word, _, _ in word_spans] 
+            for word_spans in self.tokenize_spans_many(texts)
+        ]
+
+    # MeCab finds the best path through the whole of its input, so joining
+    # the texts into a single call could change how words near the joins
+    # are split. Each text is still parsed on its own, without looking up
+    # the tagger for every text.
+    def tokenize_spans_many(self, texts:Iterable[str]) -> List[List[Tuple[Word, int, int]]]:
+        tagger = self._tagger
+        get_word_spans = self._get_word_spans
+        return [get_word_spans(tagger(text)) for text in texts]
+
+    # MeCab drops whitespace between words, so each word's position is
+    # found by adding up the lengths of the words and the whitespace
+    # before them
+    def _get_word_spans(self, tagged_words) -> List[Tuple[Word, int, int]]:
+        word_spans = []
+        current_index = 0
         for word in tagged_words:
             word_text = word.surface
-            # TODO: Add an explanation of the word.feature tuple
-            part_of_speech = word.feature[0]
+            word_starting_index = current_index + len(word.white_space)
+            current_index = word_starting_index + len(word_text)
+            # The first two fields of the word's features are its part of
+            # speech levels. word.feature parses every field into a named
+            # tuple, which costs far more than tokenizing, so the levels
+            # are read from the raw comma separated features instead,
+            # unless the first field is quoted.
+            feature_raw = word.feature_raw
+            if feature_raw.startswith('"'):
+                part_of_speech_levels = word.feature
+            else:
+                part_of_speech_levels = feature_raw.split(",", 2)
+            part_of_speech = part_of_speech_levels[0]
             # Prefer the more specific proper noun pos tag when available,
             # as it enables more accurate single kanji replacement
-            if word.feature[0] == PartOfSpeech.NOUN and \
-                word.feature[1] == PartOfSpeech.PROPER_NOUN:
-                part_of_speech = word.feature[1]
-            word_list.append(Word(word_text, part_of_speech))
-        return word_list
\ No newline at end of file
+            if part_of_speech_levels[0] == PartOfSpeech.NOUN and \
+                part_of_speech_levels[1] == PartOfSpeech.PROPER_NOUN:
+                part_of_speech = part_of_speech_levels[1]
+            word_spans.append(
+                (intern_word(word_text, part_of_speech), word_starting_index, current_index)
+            )
+        return word_spans
@@ -6,4 +6,42 @@ class PartOfSpeech(str, Enum):
     NOUN = "名詞"
     PROPER_NOUN = "固有名詞"
     PUNCTUATION = "補助記号"
-    WHITESPACE = "空白"
\ No newline at end of file
+    WHITESPACE = "空白"
+
+    @property
+    def code(self) -> int:
+        return get_part_of_speech_code(self)
+
+    # Returns the member for the code if there is one, and otherwise the
+    # part of speech tag that the code was assigned to
+    @classmethod
+    def from_code(cls, code:int) -> str:
+        part_of_speech = get_part_of_speech_from_code(code)
+        try:
+            return cls(part_of_speech)
+        except ValueError:
+            return part_of_speech
+
+# Tokenizers produce far more part of speech tags than are listed above,
+# so compact integer codes are assigned to tags as they are first seen.
+# Codes are only stable for the lifetime of the process.
+_PART_OF_SPEECH_CODES = {}
+_PART_OF_SPEECH_TAGS = []
+
+def get_part_of_speech_code(part_of_speech:str) -> int:
+    # Enum members hash by name rather than value, so look up the
+    # underlying string
+    if isinstance(part_of_speech, PartOfSpeech):
+        part_of_speech = part_of_speech.value
+    code = _PART_OF_SPEECH_CODES.get(part_of_speech)
+    if code is None:
+        code = len(_PART_OF_SPEECH_TAGS)
+        _PART_OF_SPEECH_CODES[part_of_speech] = code
+        _PART_OF_SPEECH_TAGS.append(part_of_speech)
+    return code
+
+def get_part_of_speech_from_code(code:int) -> str:
+    return _PART_OF_SPEECH_TAGS[code]
+
+for _part_of_speech in PartOfSpeech:
+    get_part_of_speech_code(_part_of_speech)
@@ -2,17 +2,28 @@ import os
 import os.path
 import json
 from tempfile import NamedTemporaryFile
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 
 import spacy
+from spacy.lang.ja import JapaneseTokenizer
+from spacy.vocab import Vocab
 import sudachipy.tokenizer
-from sudachipy import dictionary
 
 from preprocess.tokenizer.sudachi_tokenizer import SudachiTokenizer
-from preprocess.sentence import Word
+from preprocess.sentence import Word, intern_word
 from preprocess.tokenizer.part_of_speech import PartOfSpeech
 from preprocess.utils import is_punctuation
 
+# spaCy's Japanese pipelines, from smallest and fastest to largest and
+# most accurate
+SPACY_MODELS = ["ja_core_news_sm", "ja_core_news_md", "ja_core_news_lg"]
+DEFAULT_SPACY_MODEL = "ja_core_news_lg"
+
+# Components of the Japanese pipelines that don't affect token.pos_,
+# which is all that is read from them. The parts of speech come from the
+# morphologizer (using tok2vec) and the attribute ruler.
+SPACY_UNUSED_COMPONENTS = ["parser", "ner", "senter", "lemmatizer"]
+
 # spaCy (https://spacy.io/) uses Sudachi for tokenization for its JP
 # NLP processing pipelines. As a result, we can use user dictionaries
 # with spaCy by replacing their underlying Sudachi tokenizer instance
@@ -20,30 +31,64 @@ from preprocess.utils import is_punctuation
 class SpacyTokenizer(SudachiTokenizer):
     def __init__(
         self, 
-        user_dic_path:Optional[str] = None # Path to Sudachi user dic
+        user_dic_path:Optional[str] = None, # Path to Sudachi user dic
+        model:str = DEFAULT_SPACY_MODEL, # One of SPACY_MODELS
+        # If True, components in SPACY_UNUSED_COMPONENTS are not loaded
+        exclude_unused_components:bool = True,
+        # Number of texts that spaCy processes together in
+        # tokenize_many. None uses spaCy's default.
+        batch_size:Optional[int] = None,
+        # Number of processes that tokenize_many splits the texts between.
+        # Starting the processes takes a few seconds, so this is only 
+        # worth it for many texts at a time (ie. a whole chapter).
+        n_process:int = 1
     ):
-        self._tagger = spacy.load("ja_core_news_lg")
+        self._tagger = spacy.load(
+            model, 
+            exclude=SPACY_UNUSED_COMPONENTS if exclude_unused_components else []
+        )
+        self._batch_size = batch_size
+        self._n_process = n_process
         if user_dic_path:
             # It is unlikely that spaCy will stop using Sudachi for
             # tokenization in the near future. Any changes to the 
             # underlying tokenization, if they occur, should be handled
             # here.
-            if isinstance(self._tagger.tokenizer.tokenizer, sudachipy.tokenizer.Tokenizer):   
-                self._user_dic_path = user_dic_path
-                # Sudachi reads the user dictionaries that are listed in its
-                # config, but requires the config be passed as a path to
-                # a json file rather than being passed directly
-                config_path = self._generate_temporary_sudachi_config_file()
-                tokenizer = dictionary.Dictionary(config_path=config_path).create()
-                self._delete_temporary_sudachi_config_file(config_path)
-                self._tagger.tokenizer.tokenizer = tokenizer
+            if isinstance(self._tagger.tokenizer, JapaneseTokenizer) and \
+               isinstance(self._tagger.tokenizer.tokenizer, sudachipy.tokenizer.Tokenizer):   
+                self._tagger.tokenizer = _UserDicJapaneseTokenizer(
+                    self._tagger.vocab,
+                    self._tagger.tokenizer.split_mode,
+                    user_dic_path
+                )
             else:
                 raise Exception("Unable to replace spaCy tokenizer.")
 
 
     def tokenize(self, text:str) -> List[Word]:
-        word_list = []
-        tagged_words = self._tagger(text)
+        return [word for word, _, _ in self.tokenize_spans(text)]
+
+    def tokenize_spans(self, text:str) -> List[Tuple[Word, int, int]]:
+        return self._get_word_spans(self._tagger(text))
+
+    def tokenize_many(self, texts:Iterable[str]) -> List[List[Word]]:
+        return [
+            [word for word, _, _ in word_spans] 
+            for word_spans in self.tokenize_spans_many(texts)
+        ]
+
+    # spaCy's pipe runs each component over batches of texts, producing
+    # the same docs as processing the texts one at a time
+    def tokenize_spans_many(self, texts:Iterable[str]) -> List[List[Tuple[Word, int, int]]]:
+        docs = self._tagger.pipe(
+            texts, 
+            batch_size=self._batch_size, 
+            n_process=self._n_process
+        )
+        return [self._get_word_spans(doc) for doc in docs]
+
+    def _get_word_spans(self, tagged_words) -> List[Tuple[Word, int, int]]:
+        word_spans = []
         for word in tagged_words:
             word_text = word.text
             # Each spaCy tagged words has two attributes that indicate
@@ -69,8 +114,26 @@ class SpacyTokenizer(SudachiTokenizer):
             elif part_of_speech_tuple[0] == PartOfSpeech.NOUN and \
                  part_of_speech_tuple[1] == PartOfSpeech.PROPER_NOUN:
                 part_of_speech = part_of_speech_tuple[1]
-            word_list.append(Word(word_text, part_of_speech))
-        return word_list
+            word_spans.append(
+                (intern_word(word_text, part_of_speech), word.idx, word.idx + len(word_text))
+            )
+        return word_spans
+
+# spaCy's Japanese tokenizer, using a Sudachi tokenizer that reads a 
+# user dic. spaCy pickles the pipeline to send it to the processes of
+# nlp.pipe when they are not forked, and its Japanese tokenizer is 
+# rebuilt with only the default dictionary when unpickled, so the user
+# dic path is kept to rebuild it with.
+class _UserDicJapaneseTokenizer(JapaneseTokenizer):
+    def __init__(self, vocab:Vocab, split_mode:Optional[str], user_dic_path:str):
+        super().__init__(vocab, split_mode)
+        self.user_dic_path = user_dic_path
+        # Sudachi reads the user dictionaries that are listed in its
+        # config, which SudachiTokenizer takes care of
+        self.tokenizer = SudachiTokenizer(user_dic_path=user_dic_path)._tokenizer
+
+    def __reduce__(self):
+        return _UserDicJapaneseTokenizer, (self.vocab, self.split_mode, self.user_dic_path)
 
 # https://github.com/explosion/spaCy/blob/b69d249a223fa4e633e11babc0830f3b68df57e2/spacy/lang/ja/tag_map.py
 # https://github.com/explosion/spaCy/blob/b69d249a223fa4e633e11babc0830f3b68df57e2/spacy/lang/ja/tag_orth_map.py
@@ -2,16 +2,19 @@ import os
 import os.path
 import json
 from tempfile import NamedTemporaryFile
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 
 from sudachipy import tokenizer, dictionary
 
 from preprocess.tokenizer.tokenizer import Tokenizer
-from preprocess.sentence import Word
+from preprocess.sentence import Word, intern_word
 from preprocess.tokenizer.part_of_speech import PartOfSpeech
 from preprocess.utils import is_punctuation
 
 class SudachiTokenizer(Tokenizer):
+    # Sudachi rejects longer input
+    MAX_INPUT_BYTES = 49149
+
     def __init__(
         self, 
         user_dic_path:Optional[str] = None # Path to Sudachi user dic
@@ -29,8 +32,35 @@ class SudachiTokenizer(Tokenizer):
             self._tokenizer = dictionary.Dictionary().create()
 
     def tokenize(self, text:str) -> List[Word]:
-        word_list = []
-        tagged_words = self._tokenizer.tokenize(text, self._split_mode)
+        return [word for word, _, _ in self.tokenize_spans(text)]
+
+    def get_max_input_bytes(self) -> Optional[int]:
+        return SudachiTokenizer.MAX_INPUT_BYTES
+
+    def tokenize_spans(self, text:str) -> List[Tuple[Word, int, int]]:
+        return self._get_word_spans(self._tokenizer.tokenize(text, self._split_mode))
+
+    def tokenize_many(self, texts:Iterable[str]) -> List[List[Word]]:
+        return [
+            [word for word, _, _ in word_spans] 
+            for word_spans in self.tokenize_spans_many(texts)
+        ]
+
+    # Sudachi can write the results of each call into the same morpheme
+    # list instead of allocating a new one, as long as the morphemes are
+    # read before the next call
+    def tokenize_spans_many(self, texts:Iterable[str]) -> List[List[Tuple[Word, int, int]]]:
+        tokenize = self._tokenizer.tokenize
+        split_mode = self._split_mode
+        word_spans_list = []
+        tagged_words = None
+        for text in texts:
+            tagged_words = tokenize(text, split_mode, out=tagged_words)
+            word_spans_list.append(self._get_word_spans(tagged_words))
+        return word_spans_list
+
+    def _get_word_spans(self, tagged_words) -> List[Tuple[Word, int, int]]:
+        word_spans = []
         for word in tagged_words:
             word_text = word.surface()
             # TODO: Add an explanation of the part_of_speech_tuple tuple
@@ -46,8 +76,10 @@ class SudachiTokenizer(Tokenizer):
             elif part_of_speech_tuple[0] == PartOfSpeech.NOUN and \
                  part_of_speech_tuple[1] == PartOfSpeech.PROPER_NOUN:
                 part_of_speech = part_of_speech_tuple[1]
-            word_list.append(Word(word_text, part_of_speech))
-        return word_list
+            word_spans.append(
+                (intern_word(word_text, part_of_speech), word.begin(), word.end())
+            )
+        return word_spans
 
     def _generate_temporary_sudachi_config_file(self) -> str:
         sudachi_config = {
@@ -1,4 +1,6 @@
-from preprocess.sentence import Sentence
+from typing import Iterable, List, Optional, Tuple
+
+from preprocess.sentence import Sentence, Word
 
 # Splits string into words which have pos tags
 class Tokenizer:
@@ -7,3 +9,33 @@ class Tokenizer:
 
     def tokenize(self, text:str) -> Sentence:
         pass
+
+    # Same as tokenize, but returns each word along with the index it
+    # starts at and the index after its last character in text. Tokenizers
+    # that skip over characters (ie. whitespace) should override this to
+    # report where each word actually is. By default, words are assumed to
+    # follow each other without any gaps.
+    def tokenize_spans(self, text:str) -> List[Tuple[Word, int, int]]:
+        word_spans = []
+        current_starting_index = 0
+        for word in self.tokenize(text):
+            current_ending_index = current_starting_index + len(word.text)
+            word_spans.append((word, current_starting_index, current_ending_index))
+            current_starting_index = current_ending_index
+        return word_spans
+
+    # Largest text, in UTF-8 bytes, that can be tokenized in one call, or
+    # None if there is no limit
+    def get_max_input_bytes(self) -> Optional[int]:
+        return None
+
+    # Tokenizes each of the texts, with the same result as calling 
+    # tokenize on each text. Tokenizers that can handle many texts more
+    # efficiently than one at a time should override this and
+    # tokenize_spans_many.
+    def tokenize_many(self, texts:Iterable[str]) -> List[List[Word]]:
+        return [self.tokenize(text) for text in texts]
+
+    # Same as calling tokenize_spans on each text
+    def tokenize_spans_many(self, texts:Iterable[str]) -> List[List[Tuple[Word, int, int]]]:
+        return [self.tokenize_spans(text) for text in texts]
@@ -1,4 +1,4 @@
-from typing import Iterable
+from typing import Iterable, List
 import string
 
 # https://en.wikipedia.org/wiki/Katakana_(Unicode_block)
@@ -36,8 +36,18 @@ PUNCTUATION_CHARSET = {
 "◲","◳","◴","◵","◶","◷","◸",
 } | set(string.punctuation) # EN punctuation set
 
+# Frozen copies of the character sets, whose issuperset method checks
+# every character of a string against the set without creating a list
+# or calling back into Python for each character
+_KATAKANA_CHARS = frozenset(KATAKANA_CHARSET)
+_PUNCTUATION_CHARS = frozenset(PUNCTUATION_CHARSET)
+
 def is_katakana(val):
-    return all([char in KATAKANA_CHARSET for char in val])
+    return _KATAKANA_CHARS.issuperset(val)
+
+# Same as calling is_katakana on each value
+def classify_katakana(vals:Iterable[str]) -> List[bool]:
+    return list(map(_KATAKANA_CHARS.issuperset, vals))
 
 def sort_list_by_string_length(str_list:Iterable, reverse=False):
     len_tagged_str_list = [(len(word), word) for word in str_list]
@@ -47,4 +57,8 @@ def sort_list_by_string_length(str_list:Iterable, reverse=False):
     return sorted_list
 
 def is_punctuation(val):
-    return all([char in PUNCTUATION_CHARSET for char in val])
\ No newline at end of file
+    return _PUNCTUATION_CHARS.issuperset(val)
+
+# Same as calling is_punctuation on each value
+def classify_punctuation(vals:Iterable[str]) -> List[bool]:
+    return list(map(_PUNCTUATION_CHARS.issuperset, vals))
\ No newline at end of file